@@ -0,0 +1,70 @@
+"""Bulk creation of doctor and patient accounts.
+
+Used by the CSV import and the ``setup_data`` and ``generate_dataset``
+commands. Every account gets its email as username and the given password
+hash. Call these inside the transaction that creates the rows, so the
+counter updates commit or roll back with them.
+"""
+from . import counters
+from .models import Doctor, Patient, User
+
+
+def create_users(emails, role, password_hash):
+    """Insert one user per email and return them, in order, with ids set."""
+    users = User.objects.bulk_create([
+        User(username=email, email=email, password=password_hash, role=role)
+        for email in emails
+    ])
+    if users and users[0].pk is None:
+        # Backends that cannot return ids from a bulk insert.
+        ids = dict(User.objects.filter(username__in=list(emails)).values_list('username', 'id'))
+        for user in users:
+            user.pk = ids[user.username]
+    return users
+
+
+def _create_profiles(model, profiles):
+    model.objects.bulk_create(profiles)
+    if profiles and profiles[0].pk is None:
+        ids = dict(
+            model.objects.filter(user_id__in=[profile.user_id for profile in profiles]).values_list('user_id', 'id')
+        )
+        for profile in profiles:
+            profile.pk = ids[profile.user_id]
+    return profiles
+
+
+def create_doctors(rows, password_hash):
+    """Create doctor accounts for ``rows`` (email, name, specialization, optional phone).
+
+    Returns the doctors in the order of ``rows``.
+    """
+    users = create_users([row['email'] for row in rows], User.Roles.DOCTOR, password_hash)
+    doctors = _create_profiles(Doctor, [
+        Doctor(user=user, name=row['name'], specialization=row['specialization'], phone=row.get('phone') or None)
+        for user, row in zip(users, rows)
+    ])
+    counters.doctors_added([doctor.pk for doctor in doctors])
+    return doctors
+
+
+def create_patients(rows, password_hash):
+    """Create patient accounts for ``rows`` (email, full_name, age, gender, phone,
+    optional medical_history).
+
+    Returns the patients in the order of ``rows``.
+    """
+    users = create_users([row['email'] for row in rows], User.Roles.PATIENT, password_hash)
+    patients = _create_profiles(Patient, [
+        Patient(
+            user=user,
+            full_name=row['full_name'],
+            age=row['age'],
+            gender=row['gender'],
+            phone=row['phone'],
+            medical_history=row.get('medical_history', ''),
+        )
+        for user, row in zip(users, rows)
+    ])
+    counters.patients_changed(len(patients))
+    return patients
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User, Patient, Doctor, Slot, Appointment
+from .models import User, Patient, Doctor, Slot, Appointment, ArchivedSlot, ArchivedAppointment
 
 
 @admin.register(User)
@@ -32,3 +32,15 @@ class SlotAdmin(admin.ModelAdmin):
 class AppointmentAdmin(admin.ModelAdmin):
     list_display = ('id', 'patient', 'doctor', 'slot', 'status', 'created_at')
     list_filter = ('status', 'doctor', 'slot__date')
+
+
+@admin.register(ArchivedSlot)
+class ArchivedSlotAdmin(admin.ModelAdmin):
+    list_display = ('id', 'doctor', 'date', 'start_time', 'end_time', 'archived_at')
+    list_filter = ('date', 'doctor')
+
+
+@admin.register(ArchivedAppointment)
+class ArchivedAppointmentAdmin(admin.ModelAdmin):
+    list_display = ('id', 'patient', 'doctor', 'slot_date', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'doctor', 'slot_date')
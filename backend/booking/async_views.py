@@ -0,0 +1,173 @@
+"""Async variants of the read-only endpoints, mounted under ``/api/async/``.
+
+Each returns the same JSON as the sync view it mirrors; writes stay on the
+sync API. Under ASGI (``SERVER_MODE=asgi`` in start.sh) a request waiting on
+the database parks on the event loop instead of pinning a worker. Django's
+async ORM still runs each query on a thread through ``sync_to_async``, and
+cursor pagination is called the same way; serialization happens on the
+loop and never touches the database, since every relation it reads is
+loaded with ``select_related``.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework import exceptions
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import counters, events, fastpath
+from .authentication import owner_filter
+from .models import Appointment, Doctor, Slot
+from .pagination import AppointmentCursorPagination, MergedAppointmentPagination, SlotCursorPagination
+from .permissions import IsAdmin, IsDoctor
+from .serializers import (
+    AppointmentListQuerySerializer,
+    AppointmentSerializer,
+    CompactQuerySerializer,
+    DoctorSerializer,
+    SlotSerializer,
+)
+from .views import AdminDashboardAnalyticsView, AppointmentViewSet, DoctorDashboardStatsView
+
+
+def _json(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _handle_exception(exc, request, authenticators, args, kwargs):
+    """Answer ``exc`` as ``APIView.handle_exception`` does, through the configured exception handler."""
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        # 401 with a challenge when the first authenticator gives one, else 403.
+        auth_header = authenticators[0].authenticate_header(request) if authenticators else None
+        if auth_header:
+            exc.auth_header = auth_header
+        else:
+            exc.status_code = 403
+    context = {'view': None, 'args': args, 'kwargs': kwargs, 'request': request}
+    response = api_settings.EXCEPTION_HANDLER(exc, context)
+    if response is None:
+        raise exc
+    rendered = _json(response.data, status=response.status_code)
+    for name, value in response.headers.items():
+        if name != 'Content-Type':
+            rendered[name] = value
+    return rendered
+
+
+async def _authenticate(request, authenticators):
+    for authenticator in authenticators:
+        result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            return result[0]
+    return AnonymousUser()
+
+
+def read_view(permission_class=AllowAny):
+    """Wrap an async GET handler with the API's authentication, a permission class and error responses."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            authenticators = [cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+            try:
+                request.user = await _authenticate(request, authenticators)
+                permission = permission_class()
+                if not permission.has_permission(request, None):
+                    if not request.user.is_authenticated:
+                        raise exceptions.NotAuthenticated()
+                    raise exceptions.PermissionDenied(getattr(permission, 'message', None), getattr(permission, 'code', None))
+                if request.method != 'GET':
+                    raise exceptions.MethodNotAllowed(request.method)
+                return await view(request, *args, **kwargs)
+            except Exception as exc:
+                return _handle_exception(exc, request, authenticators, args, kwargs)
+        return wrapper
+    return decorator
+
+
+async def _page(paginator, queryset, request, serializer_class):
+    drf_request = Request(request)
+    page = await sync_to_async(paginator.paginate_queryset)(queryset, drf_request)
+    data = serializer_class(page, many=True).data
+    return paginator.get_paginated_response(data).data
+
+
+async def _compact_page(paginator, queryset, request, values, page):
+    """``_page`` for ``?compact=true``: ``values`` rows built by ``page``, doctors listed once."""
+    rows = await sync_to_async(paginator.paginate_queryset)(values(queryset), Request(request))
+    results, doctors = page(rows)
+    data = paginator.get_paginated_response(results).data
+    data['doctors'] = doctors
+    return data
+
+
+@read_view()
+async def doctor_list(request):
+    doctors = Doctor.objects.select_related('user').all()
+    specialization = request.GET.get('specialization')
+    if specialization:
+        doctors = doctors.filter(specialization__icontains=specialization)
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    return _json(await _page(paginator, doctors, request, DoctorSerializer))
+
+
+@read_view()
+async def doctor_slots(request, pk):
+    query = CompactQuerySerializer(data=request.GET)
+    query.is_valid(raise_exception=True)
+    doctor = await aget_object_or_404(Doctor.objects.select_related('user'), pk=pk)
+    slots = (
+        Slot.objects.filter(doctor=doctor)
+        .select_related('doctor__user')
+        .with_booking_state()
+        .filter(is_booked=False)
+    )
+    if query.validated_data['compact']:
+        return _json(await _compact_page(SlotCursorPagination(), slots, request, fastpath.slot_values, fastpath.slot_page))
+    return _json(await _page(SlotCursorPagination(), slots, request, SlotSerializer))
+
+
+@read_view(IsAuthenticated)
+async def appointment_list(request):
+    query = AppointmentListQuerySerializer(data=request.GET)
+    query.is_valid(raise_exception=True)
+    appointments = AppointmentViewSet.visible(
+        Appointment.objects
+        .select_related('patient', 'doctor__user', 'slot__doctor__user')
+        .with_slot_booking_state(),
+        request.user,
+        request.GET,
+    )
+    if query.validated_data['include_archived']:
+        paginator = MergedAppointmentPagination()
+        archived = AppointmentViewSet.visible_archived(request.user, request.GET)
+        rows = await sync_to_async(paginator.paginate_querysets)([appointments, archived], Request(request))
+        return _json(paginator.get_paginated_response(AppointmentViewSet.merged_data(rows)).data)
+    if query.validated_data['compact']:
+        return _json(await _compact_page(
+            AppointmentCursorPagination(), appointments, request, fastpath.appointment_values, fastpath.appointment_page,
+        ))
+    return _json(await _page(AppointmentCursorPagination(), appointments, request, AppointmentSerializer))
+
+
+@read_view()
+async def doctor_slot_events(request, pk):
+    await aget_object_or_404(Doctor, pk=pk)
+    return events.response(request, pk)
+
+
+@read_view(IsDoctor)
+async def doctor_dashboard_stats(request):
+    status_counts = await counters.asnapshot(**owner_filter(request.user, 'doctor'))
+    return _json(DoctorDashboardStatsView.payload(status_counts))
+
+
+@read_view(IsAdmin)
+async def admin_analytics(request):
+    status_counts = await counters.asnapshot(doctor__isnull=True)
+    doctor_activity = [counter async for counter in counters.top_doctors(6)]
+    return _json(AdminDashboardAnalyticsView.payload(status_counts, doctor_activity))
@@ -0,0 +1,102 @@
+"""Opt-in stateless JWT authentication.
+
+With ``JWT_STATELESS_AUTH`` enabled, requests authenticate from the token's
+claims alone: role and profile ids are embedded at login, so permissions and
+queryset scoping need neither the ``User`` row nor a profile lookup. The only
+database access is a per-user "still active" check cached for
+``JWT_REVOCATION_CACHE_SECONDS``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from . import timing
+from .models import Doctor, Patient, User
+
+ACTIVE_CACHE_KEY = 'auth:active:{}'
+
+
+class ClaimsUser(TokenUser):
+    """A request user backed only by token claims."""
+
+    @cached_property
+    def id(self):
+        # simplejwt serialises the user id claim as a string.
+        return User._meta.pk.to_python(super().id)
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def patient_id(self):
+        return self.token.get('patient_id')
+
+    @cached_property
+    def doctor_id(self):
+        return self.token.get('doctor_id')
+
+
+class TimedAuthenticationMixin:
+    """Report time spent authenticating as the ``auth`` Server-Timing part."""
+
+    def authenticate(self, request):
+        with timing.span(timing.AUTH):
+            return super().authenticate(request)
+
+
+class TimedJWTAuthentication(TimedAuthenticationMixin, JWTAuthentication):
+    pass
+
+
+class StatelessJWTAuthentication(TimedAuthenticationMixin, JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            # Issued before role and profile claims existed.
+            return JWTAuthentication.get_user(self, validated_token)
+        user = ClaimsUser(validated_token)
+        if not is_active(user.id):
+            raise AuthenticationFailed('User is inactive or no longer exists.', code='user_inactive')
+        return user
+
+
+def is_active(user_id):
+    return cache.get_or_set(
+        ACTIVE_CACHE_KEY.format(user_id),
+        lambda: User.objects.filter(pk=user_id, is_active=True).exists(),
+        timeout=settings.JWT_REVOCATION_CACHE_SECONDS,
+    )
+
+
+def revoke(user_id):
+    """Drop the cached active flag so a deleted or deactivated user is rejected at once."""
+    cache.delete(ACTIVE_CACHE_KEY.format(user_id))
+
+
+def owner_filter(user, profile):
+    """Lookup kwargs scoping a queryset to the caller's ``'patient'`` or ``'doctor'`` profile.
+
+    Uses the profile id from token claims when present, otherwise joins
+    through the profile's user, so neither path costs an extra query.
+    """
+    profile_id = getattr(user, f'{profile}_id', None)
+    if profile_id is not None:
+        return {f'{profile}_id': profile_id}
+    return {f'{profile}__user_id': user.pk}
+
+
+def patient_id_for(user):
+    patient_id = getattr(user, 'patient_id', None)
+    if patient_id is None:
+        patient_id = Patient.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+    return patient_id
+
+
+def doctor_id_for(user):
+    doctor_id = getattr(user, 'doctor_id', None)
+    if doctor_id is None:
+        doctor_id = Doctor.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+    return doctor_id
@@ -0,0 +1,64 @@
+"""Small helpers shared by the ``bench_*`` management commands."""
+import os
+
+from .counters import top_doctors
+from .models import Appointment, Doctor, Patient, User
+from .serializers import AdminLoginSerializer, DoctorLoginSerializer, PatientLoginSerializer
+
+
+def cores():
+    """CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list, in the list's units."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies, wall):
+    """Throughput and latency figures (milliseconds) for one benchmark run."""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'seconds': round(wall, 3),
+        'rps': round(len(ordered) / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 1),
+    }
+
+
+def sample_users():
+    """Pick ``(doctor, patient, admin)`` with real workloads, without scanning appointments.
+
+    The doctor is the busiest one according to the dashboard counters and the
+    patient is whoever booked with them most recently.
+    """
+    busiest = top_doctors(1).first()
+    doctor = busiest.doctor if busiest else Doctor.objects.first()
+    patient_id = (
+        Appointment.objects.filter(doctor=doctor).order_by('-created_at').values_list('patient_id', flat=True).first()
+    )
+    patient = Patient.objects.filter(pk=patient_id).select_related('user').first() or Patient.objects.first()
+    admin = User.objects.filter(role=User.Roles.ADMIN).order_by('pk').first()
+    if doctor is not None:
+        doctor = Doctor.objects.select_related('user').get(pk=doctor.pk)
+    return doctor, patient, admin
+
+
+def access_token(user):
+    """An access token with the same claims the login endpoints issue."""
+    serializer_class = {
+        'PATIENT': PatientLoginSerializer,
+        'DOCTOR': DoctorLoginSerializer,
+        'ADMIN': AdminLoginSerializer,
+    }[user.role]
+    claims = {}
+    if serializer_class.profile:
+        claims[serializer_class.profile_claim] = getattr(user, serializer_class.profile).id
+    return serializer_class()._generate_tokens(user, **claims)['access']
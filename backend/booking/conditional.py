@@ -0,0 +1,63 @@
+"""Conditional GET for list endpoints.
+
+A list's validator is derived from the page being asked for, read once:
+the view pages its queryset as usual, the validator is computed from the
+rows it got back, and only if the client's copy is stale are those same
+rows serialized. A matching ``If-None-Match`` returns 304 without
+serializing anything.
+
+Each row contributes what its rendering depends on: its primary key and
+``updated_at`` (every model has ``auto_now``), the ``updated_at`` of the
+related rows shown with it, and annotations computed per request such as
+whether someone else has taken an appointment's slot. Rows read with
+``values()`` contribute every value. An insert, a delete or a row leaving
+the filter changes which rows are on the page or where its links point.
+
+There is no ``Last-Modified``, since no single timestamp moves when a row
+is deleted or drops out of the filter.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+
+def row_version(row, related=(), annotations=()):
+    """What ``row`` renders from: its key and timestamp, those of ``related``
+    rows (``__``-separated paths, already loaded) and ``annotations``."""
+    if isinstance(row, dict):
+        return tuple(row.values())
+    version = [row.pk, row.updated_at]
+    for path in related:
+        obj = row
+        for name in path.split('__'):
+            obj = getattr(obj, name)
+        version.append(obj.updated_at)
+    version.extend(getattr(row, name, None) for name in annotations)
+    return tuple(version)
+
+
+class ConditionalListMixin:
+    def conditional_response(self, paginator, rows, render, version=row_version):
+        """Answer 304 if the client's copy is current, otherwise ``render()`` the response.
+
+        ``rows`` is the page ``paginator`` has just read and ``render``
+        serializes; ``version(row)`` gives what each row's rendering depends
+        on. The validator also covers the full path (filters, cursor) and
+        the caller, since the same URL lists different rows per user.
+        """
+        request = self.request
+        user = request.user
+        get_previous_link = getattr(paginator, 'get_previous_link', lambda: None)
+        page = [version(row) for row in rows], paginator.get_next_link(), get_previous_link()
+        key = repr((request.get_full_path(), user.pk if user.is_authenticated else None, page))
+        etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = render()
+        response['ETag'] = etag
+        # Let browsers keep the copy but revalidate it on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
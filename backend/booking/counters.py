@@ -0,0 +1,182 @@
+"""Incrementally maintained dashboard counters.
+
+Every helper here must be called inside the transaction that performs the
+change being counted, so a rollback discards the counter update with it.
+Doctor-scoped rows carry the doctor's id; hospital-wide rows have a NULL
+doctor. Keys are the appointment statuses plus the totals below.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Appointment, ArchivedAppointment, DashboardCounter, Doctor, Patient, Slot
+
+APPOINTMENTS = 'APPOINTMENTS'
+SLOTS = 'SLOTS'
+PATIENTS = 'PATIENTS'
+DOCTORS = 'DOCTORS'
+
+
+def _lock_order(item):
+    (doctor_id, key), _ = item
+    # Doctor rows by id, then the hospital-wide (NULL doctor) rows.
+    return (doctor_id is None, doctor_id or 0, key)
+
+
+def _add(deltas):
+    """Add ``deltas`` ({(doctor_id, key): delta}) to the counter rows."""
+    # A fixed order keeps concurrent writers from locking rows in opposite orders.
+    for (doctor_id, key), delta in sorted(deltas.items(), key=_lock_order):
+        if not delta:
+            continue
+        counter = DashboardCounter.objects.filter(doctor_id=doctor_id, key=key)
+        if counter.update(value=F('value') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                DashboardCounter.objects.create(doctor_id=doctor_id, key=key, value=delta)
+        except IntegrityError:
+            # Another transaction created the row first.
+            counter.update(value=F('value') + delta)
+
+
+def _accumulate(deltas, doctor_id, key, delta):
+    # Every doctor-scoped change also moves the hospital-wide counter.
+    for scope in (doctor_id, None):
+        deltas[(scope, key)] = deltas.get((scope, key), 0) + delta
+
+
+def bump(deltas, doctor_id=None):
+    """Add ``deltas`` ({key: delta}) to the counters of one scope."""
+    _add({(doctor_id, key): delta for key, delta in deltas.items()})
+
+
+def appointment_created(doctor_id, status):
+    deltas = {}
+    _accumulate(deltas, doctor_id, APPOINTMENTS, 1)
+    _accumulate(deltas, doctor_id, status, 1)
+    _add(deltas)
+
+
+def appointment_status_changed(doctor_id, old_status, new_status):
+    appointments_moved([(doctor_id, old_status)], new_status)
+
+
+def appointments_moved(rows, new_status):
+    """Account for appointments given as ``(doctor_id, old_status)`` pairs moving to ``new_status``."""
+    deltas = {}
+    for doctor_id, old_status in rows:
+        if old_status == new_status:
+            continue
+        _accumulate(deltas, doctor_id, new_status, 1)
+        _accumulate(deltas, doctor_id, old_status, -1)
+    _add(deltas)
+
+
+def appointments_removed(rows):
+    """Account for deleted appointments given as ``(doctor_id, status)`` pairs."""
+    deltas = {}
+    for doctor_id, status in rows:
+        _accumulate(deltas, doctor_id, APPOINTMENTS, -1)
+        _accumulate(deltas, doctor_id, status, -1)
+    _add(deltas)
+
+
+def slots_changed(doctor_id, delta):
+    bump({SLOTS: delta}, doctor_id=doctor_id)
+
+
+def patients_changed(delta):
+    bump({PATIENTS: delta})
+
+
+def doctor_added(doctor_id):
+    # A zero row keeps new doctors in the activity ranking.
+    DashboardCounter.objects.get_or_create(doctor_id=doctor_id, key=APPOINTMENTS)
+    bump({DOCTORS: 1})
+
+
+def doctors_added(doctor_ids):
+    """``doctor_added`` for many new doctors in two queries."""
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(doctor_id=doctor_id, key=APPOINTMENTS) for doctor_id in doctor_ids],
+        ignore_conflicts=True,
+    )
+    bump({DOCTORS: len(doctor_ids)})
+
+
+def doctor_removed(doctor_id):
+    """Withdraw a doctor's appointments from the global totals before deletion."""
+    totals = snapshot(doctor_id=doctor_id)
+    totals.pop(SLOTS, None)
+    bump({**{key: -value for key, value in totals.items()}, DOCTORS: -1})
+
+
+def snapshot(**lookup):
+    """Return {key: value} for the counters matching ``lookup`` in one query."""
+    return dict(DashboardCounter.objects.filter(**lookup).values_list('key', 'value'))
+
+
+async def asnapshot(**lookup):
+    return {
+        key: value
+        async for key, value in DashboardCounter.objects.filter(**lookup).values_list('key', 'value')
+    }
+
+
+def top_doctors(limit):
+    return (
+        DashboardCounter.objects
+        .filter(key=APPOINTMENTS, doctor__isnull=False)
+        .select_related('doctor')
+        .order_by('-value', 'doctor_id')[:limit]
+    )
+
+
+def compute_expected():
+    """Recompute every counter from the source tables as {(doctor_id, key): value}."""
+    expected = {}
+    for doctor_id in Doctor.objects.values_list('id', flat=True):
+        expected[(doctor_id, APPOINTMENTS)] = 0
+    # Appointment totals are all-time, archive included; slots count only the hot table.
+    for model in (Appointment, ArchivedAppointment):
+        for row in model.objects.values('doctor_id', 'status').annotate(total=Count('id')).order_by():
+            doctor_id, status, total = row['doctor_id'], row['status'], row['total']
+            for scope in (doctor_id, None):
+                expected[(scope, status)] = expected.get((scope, status), 0) + total
+                expected[(scope, APPOINTMENTS)] = expected.get((scope, APPOINTMENTS), 0) + total
+    for row in Slot.objects.values('doctor_id').annotate(total=Count('id')).order_by():
+        expected[(row['doctor_id'], SLOTS)] = row['total']
+    expected[(None, PATIENTS)] = Patient.objects.count()
+    expected[(None, DOCTORS)] = Doctor.objects.count()
+    return expected
+
+
+def stored():
+    return {
+        (doctor_id, key): value
+        for doctor_id, key, value in DashboardCounter.objects.values_list('doctor_id', 'key', 'value')
+    }
+
+
+def drift(expected, actual):
+    """List ``(doctor_id, key, actual, expected)`` for every counter that disagrees."""
+    return [
+        (doctor_id, key, actual.get((doctor_id, key), 0), value)
+        for (doctor_id, key), value in sorted(
+            {**{k: 0 for k in actual}, **expected}.items(),
+            key=lambda item: (item[0][0] or 0, item[0][1]),
+        )
+        if actual.get((doctor_id, key), 0) != value
+    ]
+
+
+@transaction.atomic
+def rebuild(expected):
+    DashboardCounter.objects.all().delete()
+    DashboardCounter.objects.bulk_create(
+        [
+            DashboardCounter(doctor_id=doctor_id, key=key, value=value)
+            for (doctor_id, key), value in expected.items()
+        ],
+        batch_size=1000,
+    )
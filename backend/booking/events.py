@@ -0,0 +1,206 @@
+"""Slot availability events, fanned out to server-sent event streams.
+
+Bookings publish ``booked`` and rejections or cancellations publish
+``freed`` on a per-doctor channel once their transaction commits. Viewers
+of a doctor's page hold one idle stream instead of polling the slot list.
+
+The streams are public on purpose. EventSource cannot send an
+``Authorization`` header, and an event carries only a doctor id and a slot
+id, which the public free-slot list already shows.
+
+Streams are only served under ASGI, where a waiting viewer costs no thread.
+A WSGI worker would be pinned for the whole life of each stream, so there
+the endpoint answers 204 No Content, which tells EventSource to stop
+reconnecting; the page keeps the slots it loaded.
+
+The broker is chosen by ``SLOT_EVENTS_BROKER``:
+
+* ``inprocess`` (default) delivers within the current process. It suits
+  local development and single-process deployments.
+* ``redis`` relays through Redis pub/sub (``SLOT_EVENTS_REDIS_URL``) so
+  every worker sees every event. It needs the ``redis`` package.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+BOOKED = 'booked'
+FREED = 'freed'
+
+# Events queued for a viewer that has stopped reading are dropped; the
+# stream stays correct after its next reconnect and full reload.
+QUEUE_SIZE = 100
+
+# Comment frames keep proxies from closing idle streams.
+KEEPALIVE = ': keepalive\n\n'
+RETRY_MS = 3000
+
+HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def channel_for(doctor_id):
+    return f'slots:doctor:{doctor_id}'
+
+
+def slot_changed(doctor_id, slot_id, kind):
+    """Publish ``kind`` for ``slot_id`` once the surrounding transaction commits."""
+    event = {'type': kind, 'doctor_id': doctor_id, 'slot_id': slot_id}
+    transaction.on_commit(lambda: _publish(channel_for(doctor_id), event))
+
+
+def _publish(channel, event):
+    # The change is already committed; a broker outage must not fail the request.
+    try:
+        get_broker().publish(channel, event)
+    except Exception:
+        logger.exception('Could not publish %s on %s.', event['type'], channel)
+
+
+def encode(event):
+    """Format ``event`` as one server-sent event frame."""
+    return f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+
+
+class AsyncSubscription:
+    """A subscription read from an event loop; waiting costs no thread."""
+
+    def __init__(self, on_close):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._on_close = on_close
+
+    def deliver(self, event):
+        # Publishers run on request threads, not on this loop.
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self._on_close(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.deliver(event)
+            except RuntimeError:
+                # The subscriber's event loop has already shut down.
+                pass
+
+    async def asubscribe(self, channel):
+        def on_close(subscription):
+            with self._lock:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+        subscription = AsyncSubscription(on_close)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+
+class AsyncRedisSubscription:
+    def __init__(self, client, pubsub):
+        self._client = client
+        self._pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+    async def close(self):
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RedisBroker:
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("SLOT_EVENTS_BROKER='redis' requires the redis package.")
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, event):
+        self._client.publish(channel, json.dumps(event))
+
+    async def asubscribe(self, channel):
+        import redis.asyncio
+
+        # Async connections are bound to the loop that opened them.
+        client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        return AsyncRedisSubscription(client, pubsub)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            backend = settings.SLOT_EVENTS_BROKER
+            if backend == 'inprocess':
+                _broker = InProcessBroker()
+            elif backend == 'redis':
+                _broker = RedisBroker(settings.SLOT_EVENTS_REDIS_URL)
+            else:
+                raise ImproperlyConfigured(f'Unknown SLOT_EVENTS_BROKER {backend!r}.')
+    return _broker
+
+
+def response(request, doctor_id):
+    """Return the event stream for ``doctor_id``, or 204 when not served over ASGI."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204, headers=HEADERS)
+    return StreamingHttpResponse(astream(doctor_id), content_type='text/event-stream', headers=HEADERS)
+
+
+async def astream(doctor_id):
+    """Yield SSE frames for ``doctor_id`` until ``SLOT_EVENTS_MAX_SECONDS`` pass.
+
+    Browsers reconnect on their own when the stream ends.
+    """
+    subscription = await get_broker().asubscribe(channel_for(doctor_id))
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        deadline = time.monotonic() + settings.SLOT_EVENTS_MAX_SECONDS
+        while time.monotonic() < deadline:
+            event = await subscription.get(timeout=settings.SLOT_EVENTS_KEEPALIVE_SECONDS)
+            yield encode(event) if event else KEEPALIVE
+    finally:
+        await subscription.close()
@@ -0,0 +1,19 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SlotUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This slot has just been taken.'
+    default_code = 'slot_unavailable'
+
+
+class LoginBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress; please retry shortly.'
+    default_code = 'login_busy'
+
+    def __init__(self, retry_after, detail=None, code=None):
+        super().__init__(detail, code)
+        # DRF's exception handler sends ``wait`` as the Retry-After header.
+        self.wait = retry_after
@@ -0,0 +1,104 @@
+"""``values()`` row builders for the busiest list endpoints (``?compact=true``).
+
+The DRF serializers build a tree of fields for every row, and an
+appointment carries its doctor twice: once directly and once inside its
+slot. These builders read plain dicts from ``values()`` and put each doctor
+once in a page-level ``doctors`` map keyed by id; rows refer to it with
+``"doctor": <id>``. Otherwise the rows match the serializers field for field,
+including date and time formats.
+"""
+from django.utils import timezone
+
+from .models import ACTIVE_APPOINTMENT_STATUSES
+from .timing import SERIALIZE, span
+
+DOCTOR_LOOKUPS = {
+    'id': 'doctor_id',
+    'name': 'doctor__name',
+    'specialization': 'doctor__specialization',
+    'phone': 'doctor__phone',
+    'email': 'doctor__user__email',
+}
+
+APPOINTMENT_LOOKUPS = (
+    'id', 'patient__full_name', 'status', 'created_at', 'updated_at',
+    'slot_id', 'slot__date', 'slot__start_time', 'slot__end_time', 'slot_taken_by_other',
+    *DOCTOR_LOOKUPS.values(),
+)
+
+SLOT_LOOKUPS = ('id', 'date', 'start_time', 'end_time', 'is_booked', *DOCTOR_LOOKUPS.values())
+
+
+def _datetime(value, zone):
+    # Same as DRF's DateTimeField: ``zone`` is the current time zone, looked
+    # up once per page since the lookup costs more than the formatting.
+    if value is None:
+        return None
+    value = value.astimezone(zone).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _doctor(row, doctors):
+    doctor_id = row['doctor_id']
+    if doctor_id not in doctors:
+        doctors[doctor_id] = {name: row[lookup] for name, lookup in DOCTOR_LOOKUPS.items()}
+    return doctor_id
+
+
+def appointment_values(queryset):
+    """``queryset`` (annotated ``with_slot_booking_state``) as the dicts ``appointment_page`` reads."""
+    return queryset.values(*APPOINTMENT_LOOKUPS)
+
+
+@span(SERIALIZE)
+def appointment_page(rows):
+    """Return ``(results, doctors)`` for a page of ``appointment_values`` rows."""
+    doctors = {}
+    results = []
+    zone = timezone.get_current_timezone()
+    for row in rows:
+        if row['status'] in ACTIVE_APPOINTMENT_STATUSES:
+            is_booked = True
+        else:
+            is_booked = row['slot_taken_by_other']
+        results.append({
+            'id': row['id'],
+            'patient': row['patient__full_name'],
+            'doctor': _doctor(row, doctors),
+            'slot': {
+                'id': row['slot_id'],
+                'date': row['slot__date'].isoformat(),
+                'start_time': row['slot__start_time'].isoformat(),
+                'end_time': row['slot__end_time'].isoformat(),
+                'is_booked': is_booked,
+            },
+            'status': row['status'],
+            'created_at': _datetime(row['created_at'], zone),
+            'updated_at': _datetime(row['updated_at'], zone),
+        })
+    return results, doctors
+
+
+def slot_values(queryset):
+    """``queryset`` (annotated ``with_booking_state``) as the dicts ``slot_page`` reads."""
+    return queryset.values(*SLOT_LOOKUPS)
+
+
+@span(SERIALIZE)
+def slot_page(rows):
+    """Return ``(results, doctors)`` for a page of ``slot_values`` rows."""
+    doctors = {}
+    results = [
+        {
+            'id': row['id'],
+            'doctor': _doctor(row, doctors),
+            'date': row['date'].isoformat(),
+            'start_time': row['start_time'].isoformat(),
+            'end_time': row['end_time'].isoformat(),
+            'is_booked': row['is_booked'],
+        }
+        for row in rows
+    ]
+    return results, doctors
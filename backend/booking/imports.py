@@ -0,0 +1,148 @@
+"""Bulk CSV import of doctors and patients.
+
+The file is read row by row and handled in batches: each batch is
+validated, checked for emails repeated in the file or already taken in the
+database, and inserted with ``bulk_create`` in its own transaction. Memory
+depends on the batch size plus one email per row, and the error report
+keeps at most ``MAX_REPORTED_ERRORS`` rows. Batches that were saved stay
+saved if a later one fails; re-importing the file skips the rows that
+already exist.
+
+Imported accounts share one initial password, hashed once per import, or
+get an unusable password when none is given.
+"""
+import csv
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from . import accounts
+from .models import User
+from .serializers import DoctorImportRowSerializer, PatientImportRowSerializer
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    """The file is not a CSV with the expected columns."""
+
+
+class Report:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, email, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'email': email, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+class Importer:
+    row_serializer = None
+    create_accounts = None
+
+    def __init__(self, password=None, batch_size=BATCH_SIZE):
+        self.password_hash = make_password(password)
+        self.batch_size = batch_size
+
+    def run(self, lines):
+        """Import the CSV text in ``lines`` and return the report as a dict."""
+        reader = csv.DictReader(lines, restval='')
+        report = Report()
+        # Line of each email accepted so far, to catch duplicates across batches.
+        self.seen = {}
+        try:
+            columns = set(reader.fieldnames or ())
+            missing = [name for name, field in self.row_serializer().fields.items()
+                       if field.required and name not in columns]
+            if missing:
+                raise ImportFormatError(f'Missing columns: {", ".join(missing)}.')
+
+            batch = []
+            for row in reader:
+                batch.append((reader.line_num, row))
+                if len(batch) == self.batch_size:
+                    self.import_batch(batch, report)
+                    batch = []
+            self.import_batch(batch, report)
+        except (csv.Error, UnicodeDecodeError) as exc:
+            if reader.line_num <= 1:
+                raise ImportFormatError(f'Could not read the file as CSV: {exc}')
+            # Rows before the unreadable line are already saved.
+            report.fail(reader.line_num, None, {'file': [f'Import stopped here: {exc}']})
+        return report.as_dict()
+
+    def import_batch(self, batch, report):
+        # One serializer validates every row: building its fields per row
+        # would cost more than the validation itself.
+        validator = self.row_serializer()
+        valid = {}
+        for line, row in batch:
+            try:
+                data = validator.run_validation(row)
+            except serializers.ValidationError as exc:
+                report.fail(line, row.get('email'), serializers.as_serializer_error(exc))
+                continue
+            if data['email'] in self.seen:
+                report.fail(line, data['email'], {
+                    'email': [f'Duplicate of line {self.seen[data["email"]]} in this file.'],
+                })
+                continue
+            self.seen[data['email']] = line
+            valid[data['email']] = (line, data)
+
+        # A user created by another request between the check and the insert
+        # fails the batch; checking again reports that row and saves the rest.
+        for _ in range(2):
+            self.drop_existing(valid, report)
+            if not valid:
+                return
+            try:
+                with transaction.atomic():
+                    self.create_accounts([data for _, data in valid.values()], self.password_hash)
+            except IntegrityError as exc:
+                error = exc
+                continue
+            report.created += len(valid)
+            return
+        for line, data in valid.values():
+            report.fail(line, data['email'], {'email': [f'Not saved, the database rejected this batch: {error}']})
+
+    def drop_existing(self, valid, report):
+        """Report and remove the rows of ``valid`` whose email or username is taken."""
+        emails = list(valid)
+        taken = User.objects.filter(Q(email__in=emails) | Q(username__in=emails)).values_list('email', 'username')
+        for email, username in taken:
+            for value in (email, username):
+                if value in valid:
+                    line, _ = valid.pop(value)
+                    report.fail(line, value, {'email': ['A user with this email already exists.']})
+
+
+class DoctorImporter(Importer):
+    row_serializer = DoctorImportRowSerializer
+    create_accounts = staticmethod(accounts.create_doctors)
+
+
+class PatientImporter(Importer):
+    row_serializer = PatientImportRowSerializer
+    create_accounts = staticmethod(accounts.create_patients)
+
+
+IMPORTERS = {
+    'doctors': DoctorImporter,
+    'patients': PatientImporter,
+}
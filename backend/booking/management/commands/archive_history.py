@@ -0,0 +1,55 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves finished appointments and unused slots dated before the cutoff into the '
+        'archive tables, in chunked transactions. Safe to interrupt and rerun.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            help='Cutoff date (YYYY-MM-DD); defaults to ARCHIVE_AFTER_DAYS days ago.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=archive.CHUNK_SIZE)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the rows that would be archived.',
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError(f'Invalid --before date: {options["before"]}')
+        else:
+            cutoff = archive.default_cutoff()
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        if options['dry_run']:
+            # Slots whose appointments are archived first are not counted here.
+            self.stdout.write(
+                f'Before {cutoff}: {archive.archivable_appointments(cutoff).count()} appointments '
+                f'and {archive.archivable_slots(cutoff).count()} unbooked slots to archive.'
+            )
+            return
+
+        def progress(name, moved):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {name}: {moved} archived')
+
+        started = time.perf_counter()
+        appointments, slots = archive.archive(cutoff, chunk_size=options['chunk_size'], progress=progress)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {appointments} appointments and {slots} slots dated before {cutoff} in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,98 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from booking import archive
+from booking.benchmarking import access_token, percentile, sample_users
+from booking.models import Appointment, ArchivedAppointment, ArchivedSlot, Slot
+
+# (label, who calls it, path below /api/)
+ENDPOINTS = [
+    ('doctor slots', None, 'doctors/{doctor}/slots/'),
+    ('appointments (doctor)', 'doctor', 'appointments/'),
+    ('appointments (patient)', 'patient', 'appointments/'),
+    ('appointments (admin)', 'admin', 'appointments/'),
+    ('appointments (admin, by status)', 'admin', 'appointments/?status=CANCELLED'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the slot and appointment lists before and after archiving the '
+        'current dataset. The archive run is rolled back afterwards unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Cutoff date (YYYY-MM-DD); defaults to ARCHIVE_AFTER_DAYS days ago.')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint and run.')
+        parser.add_argument('--keep', action='store_true', help='Keep the archived state instead of rolling it back.')
+
+    def handle(self, *args, **options):
+        doctor, patient, admin = sample_users()
+        if not (doctor and patient and admin):
+            raise CommandError('Seed at least one admin, doctor and patient before benchmarking.')
+        try:
+            cutoff = date.fromisoformat(options['before']) if options['before'] else archive.default_cutoff()
+        except ValueError:
+            raise CommandError(f'Invalid --before date: {options["before"]}')
+
+        self.headers = {
+            None: {},
+            'doctor': {'Authorization': f'Bearer {access_token(doctor.user)}'},
+            'patient': {'Authorization': f'Bearer {access_token(patient.user)}'},
+            'admin': {'Authorization': f'Bearer {access_token(admin)}'},
+        }
+        self.doctor = doctor
+        self.total = options['requests']
+
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            before = self._sizes(), self._measure()
+            with transaction.atomic():
+                started = time.perf_counter()
+                moved = archive.archive(cutoff)
+                elapsed = time.perf_counter() - started
+                after = self._sizes(), self._measure()
+                transaction.set_rollback(not options['keep'])
+
+        self.stdout.write(
+            f'Archived {moved[0]} appointments and {moved[1]} slots dated before {cutoff} in {elapsed:.1f}s'
+            f'{"" if options["keep"] else " (rolled back)"}.'
+        )
+        self.stdout.write(f'{"table":<24}{"before":>10}{"after":>10}')
+        for table in before[0]:
+            self.stdout.write(f'{table:<24}{before[0][table]:>10}{after[0][table]:>10}')
+        self.stdout.write(f'\n{self.total} requests per endpoint, first page')
+        self.stdout.write(f'{"endpoint":<34}{"p50 before":>12}{"p50 after":>12}{"p95 before":>12}{"p95 after":>12}')
+        for label, _, _ in ENDPOINTS:
+            (p50_before, p95_before), (p50_after, p95_after) = before[1][label], after[1][label]
+            self.stdout.write(
+                f'{label:<34}{p50_before:>10.1f}ms{p50_after:>10.1f}ms{p95_before:>10.1f}ms{p95_after:>10.1f}ms'
+            )
+
+    def _sizes(self):
+        return {
+            'slots': Slot.objects.count(),
+            'appointments': Appointment.objects.count(),
+            'archived slots': ArchivedSlot.objects.count(),
+            'archived appointments': ArchivedAppointment.objects.count(),
+        }
+
+    def _measure(self):
+        client = Client()
+        results = {}
+        for label, caller, path in ENDPOINTS:
+            path = f'/api/{path.format(doctor=self.doctor.id)}'
+            latencies = []
+            for _ in range(self.total):
+                started = time.perf_counter()
+                response = client.get(path, headers=self.headers[caller])
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f'{path}: HTTP {response.status_code}.')
+            latencies.sort()
+            results[label] = (percentile(latencies, 0.50) * 1000, percentile(latencies, 0.95) * 1000)
+        return results
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from booking.benchmarking import access_token, sample_users, summarize
+
+# (label, who calls it, path below /api/ or /api/async/)
+ENDPOINTS = [
+    ('doctor list', None, 'doctors/'),
+    ('doctor slots', None, 'doctors/{doctor}/slots/'),
+    ('appointments (doctor)', 'doctor', 'appointments/'),
+    ('appointments (patient)', 'patient', 'appointments/'),
+    ('doctor dashboard', 'doctor', 'doctor/dashboard-stats'),
+    ('admin analytics', 'admin', 'admin/analytics'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the sync API with its async mirrors under /api/async/ on the '
+        'current dataset: requests per second and p99 latency for concurrent '
+        'clients. Both run in-process (WSGI handler on threads, ASGI handler on '
+        'one event loop), so the figures compare the two code paths rather than '
+        'a deployed server.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Requests per endpoint and mode.')
+        parser.add_argument('--concurrency', type=int, default=16)
+
+    def handle(self, *args, **options):
+        doctor, patient, admin = sample_users()
+        if not (doctor and patient and admin):
+            raise CommandError('Seed at least one admin, doctor and patient before benchmarking.')
+
+        tokens = {
+            None: None,
+            'doctor': access_token(doctor.user),
+            'patient': access_token(patient.user),
+            'admin': access_token(admin),
+        }
+        total, concurrency = options['requests'], options['concurrency']
+
+        rows = []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for label, caller, path in ENDPOINTS:
+                path = path.format(doctor=doctor.id)
+                headers = {'Authorization': f'Bearer {tokens[caller]}'} if caller else {}
+                self._check_parity(path, headers)
+                sync = self._run_sync(f'/api/{path}', headers, total, concurrency)
+                async_ = asyncio.run(self._run_async(f'/api/async/{path}', headers, total, concurrency))
+                rows.append((label, sync, async_))
+
+        self.stdout.write(f'{total} requests per run, {concurrency} concurrent clients')
+        self.stdout.write(f'{"endpoint":<24}{"sync rps":>10}{"sync p99":>11}{"async rps":>11}{"async p99":>11}')
+        for label, sync, async_ in rows:
+            self.stdout.write(
+                f'{label:<24}{sync["rps"]:>10.1f}{sync["p99_ms"]:>9.1f}ms'
+                f'{async_["rps"]:>11.1f}{async_["p99_ms"]:>9.1f}ms'
+            )
+
+    def _check_parity(self, path, headers):
+        sync = Client().get(f'/api/{path}', headers=headers)
+        async_ = asyncio.run(AsyncClient().get(f'/api/async/{path}', headers=headers))
+        if sync.status_code != 200 or async_.status_code != 200:
+            raise CommandError(f'{path}: sync {sync.status_code}, async {async_.status_code}.')
+        if json.loads(sync.content) != json.loads(async_.content):
+            self.stdout.write(self.style.WARNING(f'{path}: sync and async responses differ.'))
+
+    def _run_sync(self, path, headers, total, concurrency):
+        latencies = []
+        remaining = iter(range(total))
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    started = time.perf_counter()
+                    client.get(path, headers=headers)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(latencies, time.perf_counter() - started)
+
+    async def _run_async(self, path, headers, total, concurrency):
+        latencies = []
+        remaining = iter(range(total))
+
+        async def worker():
+            client = AsyncClient()
+            while next(remaining, None) is not None:
+                started = time.perf_counter()
+                await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, time.perf_counter() - started)
@@ -0,0 +1,149 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from booking.benchmarking import percentile
+from booking.models import Doctor
+
+# mode -> how its connections are handled
+MODES = {
+    'direct': 'CONN_MAX_AGE=0: a new connection per request',
+    'persistent': 'CONN_MAX_AGE: one connection per thread until it ages out',
+    'pooled': 'psycopg pool shared by the threads',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures connection setup overhead under bursty load, with and without '
+        'the connection pool. Worker threads serve bursts of short requests with '
+        'idle pauses in between, the way gunicorn threads see traffic, against the '
+        'default PostgreSQL database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=['direct', 'persistent', 'pooled'])
+        parser.add_argument('--bursts', type=int, default=5)
+        parser.add_argument('--burst-size', type=int, default=64, help='Requests per burst.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Worker threads.')
+        parser.add_argument('--pause', type=float, default=2.0, help='Idle seconds between bursts.')
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            default=30,
+            help='CONN_MAX_AGE of the persistent mode; below --pause, every burst reconnects.',
+        )
+
+    def handle(self, *args, **options):
+        default = connections[DEFAULT_DB_ALIAS]
+        if default.vendor != 'postgresql':
+            raise CommandError('Connection setup is only worth measuring against PostgreSQL.')
+        if 'pooled' in options['modes']:
+            try:
+                import psycopg_pool  # noqa: F401
+            except ImportError:
+                raise CommandError('The pooled mode needs psycopg 3 with psycopg_pool installed.')
+
+        self.options = options
+        self.stdout.write(
+            f'{options["bursts"]} bursts of {options["burst_size"]} requests, '
+            f'{options["concurrency"]} threads, {options["pause"]}s pauses'
+        )
+        self.stdout.write(
+            f'{"mode":<12}{"connects":>10}{"setup p50":>11}{"setup p95":>11}'
+            f'{"req p50":>10}{"req p95":>10}{"req p99":>10}{"busy":>9}'
+        )
+        for mode in options['modes']:
+            alias = f'bench_{mode}'
+            configured = connections.configure_settings({**settings.DATABASES, alias: self.settings_for(mode)})
+            connections.settings[alias] = configured[alias]
+            try:
+                result = self.run(alias)
+            finally:
+                if mode == 'pooled':
+                    connections[alias].close_pool()
+                del connections.settings[alias]
+            self.stdout.write(
+                f'{mode:<12}{result["connects"]:>10}{result["setup_p50"]:>9.2f}ms{result["setup_p95"]:>9.2f}ms'
+                f'{result["p50"]:>8.2f}ms{result["p95"]:>8.2f}ms{result["p99"]:>8.2f}ms{result["wall"]:>8.2f}s'
+            )
+        for mode in options['modes']:
+            self.stdout.write(f'  {mode}: {MODES[mode]}')
+
+    def settings_for(self, mode):
+        config = {
+            key: value for key, value in settings.DATABASES[DEFAULT_DB_ALIAS].items()
+            if key not in ('TEST',)
+        }
+        config['OPTIONS'] = {key: value for key, value in config.get('OPTIONS', {}).items() if key != 'pool'}
+        if mode == 'direct':
+            config['CONN_MAX_AGE'] = 0
+        elif mode == 'persistent':
+            config['CONN_MAX_AGE'] = self.options['conn_max_age']
+        else:
+            config['CONN_MAX_AGE'] = 0
+            config['OPTIONS']['pool'] = {
+                **settings.DATABASE_POOL_OPTIONS,
+                # Keep the whole burst's worth of threads served.
+                'max_size': max(settings.DATABASE_POOL_OPTIONS['max_size'], self.options['concurrency']),
+            }
+        return config
+
+    def run(self, alias):
+        options = self.options
+        setups = []
+        latencies = []
+        connects = [0]
+        lock = threading.Lock()
+
+        def request():
+            connection = connections[alias]
+            started = time.perf_counter()
+            reconnect = connection.connection is None
+            connection.ensure_connection()
+            connected = time.perf_counter()
+            # A short read like most API requests: one indexed page.
+            list(Doctor.objects.using(alias).order_by('id').values_list('id', 'name')[:20])
+            # What Django does when a request finishes.
+            connection.close_if_unusable_or_obsolete()
+            finished = time.perf_counter()
+            with lock:
+                setups.append(connected - started)
+                latencies.append(finished - started)
+                if reconnect:
+                    connects[0] += 1
+
+        def close():
+            connections[alias].close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for burst in range(options['bursts']):
+                if burst:
+                    time.sleep(options['pause'])
+                for future in [executor.submit(request) for _ in range(options['burst_size'])]:
+                    future.result()
+            wall = time.perf_counter() - started - options['pause'] * (options['bursts'] - 1)
+            # Close each worker's connection; the barrier puts one call on every thread.
+            barrier = threading.Barrier(options['concurrency'])
+            for future in [executor.submit(lambda: (barrier.wait(), close())) for _ in range(options['concurrency'])]:
+                future.result()
+
+        if alias == 'bench_pooled':
+            # Checkouts always start without a connection; the pool knows how many it opened.
+            connects[0] = connections[alias].pool.get_stats().get('connections_num', 0)
+        setups.sort()
+        latencies.sort()
+        return {
+            'connects': connects[0],
+            'setup_p50': percentile(setups, 0.50) * 1000,
+            'setup_p95': percentile(setups, 0.95) * 1000,
+            'p50': percentile(latencies, 0.50) * 1000,
+            'p95': percentile(latencies, 0.95) * 1000,
+            'p99': percentile(latencies, 0.99) * 1000,
+            'wall': wall,
+        }
@@ -0,0 +1,323 @@
+import json
+import time
+from datetime import date, timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking import counters, urls
+from booking.benchmarking import access_token, percentile, sample_users
+from booking.management.commands.generate_dataset import DEFAULT_PASSWORD
+from booking.models import ACTIVE_APPOINTMENT_STATUSES, Appointment, DashboardCounter, Slot
+
+# Route methods deliberately left out of the run, with the reason recorded
+# in the report.
+SKIPPED = {
+    ('doctor-slot-events', 'GET'): 'streams until the client disconnects',
+    ('async-doctor-slot-events', 'GET'): 'streams until the client disconnects',
+    ('patient-profile', 'PUT'): 'same handler as PATCH',
+    ('slot-detail', 'PUT'): 'same handler as PATCH',
+    ('appointment-detail', 'PUT'): 'same handler as PATCH',
+    ('admin-doctor-detail', 'PUT'): 'same handler as PATCH',
+}
+
+
+class Probe:
+    def __init__(self, label, route, method, caller, path, data=None, writes=False, format='json'):
+        self.label = label
+        self.route = route
+        self.method = method
+        self.caller = caller
+        self.path = path
+        # A callable is called per request, for payloads that are consumed
+        # when sent, such as uploads.
+        self.data = data
+        self.writes = writes
+        self.format = format
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs every route in booking/urls.py against the current dataset (see '
+        'generate_dataset) and writes latency percentiles and query counts to a '
+        'JSON report. Writes run inside a transaction that is rolled back, so the '
+        'dataset is unchanged.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per probe.')
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the sampled accounts, for logins.')
+        parser.add_argument('--output', default='bench-report.json')
+        parser.add_argument('--label', default='', help='Free-form tag stored in the report, e.g. a release.')
+        parser.add_argument('--compare', help='A previous report to print differences against.')
+
+    def handle(self, *args, **options):
+        doctor, patient, admin = sample_users()
+        if not (doctor and patient and admin):
+            raise CommandError('Seed at least one admin, doctor and patient (see generate_dataset).')
+        tokens = {
+            'doctor': access_token(doctor.user),
+            'patient': access_token(patient.user),
+            'admin': access_token(admin),
+        }
+
+        probes = self._probes(doctor, patient, admin, options['password'])
+        covered = {(probe.route, probe.method) for probe in probes}
+        unprobed = sorted(set(self._routes()) - covered - set(SKIPPED))
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for probe in probes:
+                results.append(self._measure(probe, tokens, options['iterations'], options['warmup']))
+
+        report = {
+            'label': options['label'],
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'dataset': self._dataset(),
+            'results': results,
+            'skipped': [
+                {'route': route, 'method': method, 'reason': reason}
+                for (route, method), reason in sorted(SKIPPED.items())
+            ],
+            'unprobed': [{'route': route, 'method': method} for route, method in unprobed],
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+        self._print(results)
+        for route, method in unprobed:
+            self.stdout.write(self.style.WARNING(f'No probe for {method} {route}; add one to bench_endpoints.'))
+        if options['compare']:
+            self._compare(options['compare'], results)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {options["output"]}.'))
+
+    def _routes(self):
+        """Yield ``(name, METHOD)`` for every route in booking/urls.py."""
+        for pattern in urls.urlpatterns:
+            callback = pattern.callback
+            actions = getattr(callback, 'actions', None)
+            view_class = getattr(callback, 'view_class', None)
+            if actions:
+                methods = actions.keys()
+            elif view_class is not None:
+                methods = [
+                    method for method in view_class.http_method_names
+                    if method not in ('head', 'options', 'trace') and hasattr(view_class, method)
+                ]
+            else:
+                methods = ['get']
+            for method in methods:
+                yield pattern.name, method.upper()
+
+    def _probes(self, doctor, patient, admin, password):
+        free_slot = (
+            Slot.objects.filter(doctor=doctor).with_booking_state().filter(is_booked=False)
+            .order_by('-date').values_list('id', flat=True).first()
+        )
+        any_slot = Slot.objects.filter(doctor=doctor).values_list('id', flat=True).first()
+        pending = list(
+            Appointment.objects.filter(doctor=doctor, status=Appointment.Status.PENDING)
+            .order_by('-created_at').values_list('id', flat=True)[:20]
+        )
+        active = (
+            Appointment.objects.filter(patient=patient, status__in=ACTIVE_APPOINTMENT_STATUSES)
+            .exclude(status=Appointment.Status.COMPLETED)
+            .values_list('id', flat=True).first()
+        )
+        own = Appointment.objects.filter(patient=patient).values_list('id', flat=True).first()
+        # Far enough ahead not to collide with generated slots.
+        spare_day = date.today() + timedelta(days=3650)
+        term = doctor.specialization[:5]
+
+        def roster(header, row, rows=100):
+            lines = [header] + [row.format(i) for i in range(rows)]
+            return SimpleUploadedFile('roster.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+        probes = [
+            Probe('register', 'patient-register', 'POST', None, 'patient/register', {
+                'email': 'bench-register@synthetic.test', 'password': 'Bench-Register-2024',
+                'full_name': 'Bench Patient', 'age': 30, 'gender': 'Female', 'phone': '+910000000000',
+            }, writes=True),
+            Probe('patient login', 'patient-login', 'POST', None, 'patient/login',
+                  {'email': patient.user.email, 'password': password}),
+            Probe('doctor login', 'doctor-login', 'POST', None, 'doctor/login',
+                  {'email': doctor.user.email, 'password': password}),
+            Probe('admin login', 'admin-login', 'POST', None, 'admin/login',
+                  {'email': admin.email, 'password': password}),
+            Probe('profile', 'patient-profile', 'GET', 'patient', 'patient/profile'),
+            Probe('profile update', 'patient-profile', 'PATCH', 'patient', 'patient/profile',
+                  {'phone': '+910000000001'}, writes=True),
+            Probe('doctor dashboard', 'doctor-dashboard-stats', 'GET', 'doctor', 'doctor/dashboard-stats'),
+            Probe('admin analytics', 'admin-analytics', 'GET', 'admin', 'admin/analytics'),
+            Probe('analytics trends', 'admin-analytics-trends', 'GET', 'admin',
+                  'admin/analytics/trends?interval=week&group_by=specialization'),
+            Probe('admin patients', 'admin-patients', 'GET', 'admin', 'admin/patients'),
+            Probe('database pool', 'admin-database-pool', 'GET', 'admin', 'admin/database/pool'),
+            Probe('api root', 'api-root', 'GET', 'admin', ''),
+            Probe('doctor list', 'doctor-list', 'GET', None, 'doctors/'),
+            Probe('doctor list by specialization', 'doctor-list', 'GET', None, f'doctors/?specialization={term}'),
+            Probe('doctor search', 'doctor-search-directory', 'GET', None, f'doctors/search/?q={term}'),
+            Probe('doctor detail', 'doctor-detail', 'GET', None, f'doctors/{doctor.id}/'),
+            Probe('doctor availability', 'doctor-availability', 'GET', None, f'doctors/{doctor.id}/availability/'),
+            Probe('doctor slots', 'doctor-slots', 'GET', None, f'doctors/{doctor.id}/slots/'),
+            Probe('own slots', 'slot-list', 'GET', 'doctor', 'slots/'),
+            Probe('create slot', 'slot-list', 'POST', 'doctor', 'slots/', {
+                'date': spare_day.isoformat(), 'start_time': '07:00', 'end_time': '07:30',
+            }, writes=True),
+            Probe('generate slots', 'slot-generate', 'POST', 'doctor', 'slots/generate/', {
+                'start_date': spare_day.isoformat(), 'end_date': (spare_day + timedelta(days=6)).isoformat(),
+                'start_time': '07:00', 'end_time': '08:00', 'slot_minutes': 15,
+            }, writes=True),
+            Probe('slot detail', 'slot-detail', 'GET', 'doctor', f'slots/{any_slot}/'),
+            Probe('update slot', 'slot-detail', 'PATCH', 'doctor', f'slots/{any_slot}/',
+                  {'date': spare_day.isoformat()}, writes=True),
+            Probe('delete slot', 'slot-detail', 'DELETE', 'doctor', f'slots/{free_slot}/', writes=True),
+            Probe('appointments (patient)', 'appointment-list', 'GET', 'patient', 'appointments/'),
+            Probe('appointments (doctor)', 'appointment-list', 'GET', 'doctor', 'appointments/'),
+            Probe('pending appointments (doctor)', 'appointment-list', 'GET', 'doctor', 'appointments/?status=PENDING'),
+            Probe('appointments (admin)', 'appointment-list', 'GET', 'admin', 'appointments/'),
+            Probe('compact appointments (admin)', 'appointment-list', 'GET', 'admin', 'appointments/?compact=true'),
+            Probe('appointments with archive (admin)', 'appointment-list', 'GET', 'admin',
+                  'appointments/?include_archived=true'),
+            Probe('book', 'appointment-list', 'POST', 'patient', 'appointments/', {'slot_id': free_slot}, writes=True),
+            Probe('appointment detail', 'appointment-detail', 'GET', 'patient', f'appointments/{own}/'),
+            Probe('appointment update', 'appointment-detail', 'PATCH', 'patient', f'appointments/{own}/', {},
+                  writes=True),
+            Probe('appointment delete', 'appointment-detail', 'DELETE', 'admin', f'appointments/{own}/', writes=True),
+            Probe('export (one doctor)', 'appointment-export', 'GET', 'admin',
+                  f'appointments/export/?doctor_id={doctor.id}'),
+            Probe('bulk approve', 'appointment-bulk-transition', 'POST', 'doctor', 'appointments/bulk-transition/',
+                  {'ids': pending or [0], 'status': 'APPROVED'}, writes=True),
+            Probe('admin doctors', 'admin-doctor-list', 'GET', 'admin', 'admin/doctors/'),
+            Probe('admin create doctor', 'admin-doctor-list', 'POST', 'admin', 'admin/doctors/', {
+                'email': 'bench-doctor@synthetic.test', 'password': 'Bench-Doctor-2024',
+                'name': 'Dr. Bench', 'specialization': 'Cardiology',
+            }, writes=True),
+            Probe('admin import doctors', 'admin-doctor-import', 'POST', 'admin', 'admin/doctors/import',
+                  lambda: {'file': roster('email,name,specialization', 'bench-import-{}@synthetic.test,Dr. Bench,Surgery')},
+                  writes=True, format='multipart'),
+            Probe('admin import patients', 'admin-patient-import', 'POST', 'admin', 'admin/patients/import',
+                  lambda: {'file': roster('email,full_name,age,gender,phone',
+                                          'bench-import-{}@synthetic.test,Bench Patient,40,Male,+910000000003')},
+                  writes=True, format='multipart'),
+            Probe('admin doctor detail', 'admin-doctor-detail', 'GET', 'admin', f'admin/doctors/{doctor.id}/'),
+            Probe('admin update doctor', 'admin-doctor-detail', 'PATCH', 'admin', f'admin/doctors/{doctor.id}/',
+                  {'phone': '+910000000002'}, writes=True),
+            Probe('admin delete doctor', 'admin-doctor-detail', 'DELETE', 'admin', f'admin/doctors/{doctor.id}/',
+                  writes=True),
+            Probe('async doctor list', 'async-doctor-list', 'GET', None, 'async/doctors/'),
+            Probe('async doctor slots', 'async-doctor-slots', 'GET', None, f'async/doctors/{doctor.id}/slots/'),
+            Probe('async appointments (doctor)', 'async-appointment-list', 'GET', 'doctor', 'async/appointments/'),
+            Probe('async doctor dashboard', 'async-doctor-dashboard-stats', 'GET', 'doctor',
+                  'async/doctor/dashboard-stats'),
+            Probe('async admin analytics', 'async-admin-analytics', 'GET', 'admin', 'async/admin/analytics'),
+        ]
+        if pending:
+            probes += [
+                Probe('approve', 'appointment-approve', 'POST', 'doctor',
+                      f'appointments/{pending[0]}/approve/', writes=True),
+                Probe('reject', 'appointment-reject', 'POST', 'doctor',
+                      f'appointments/{pending[0]}/reject/', writes=True),
+            ]
+        if active:
+            probes.append(Probe('cancel', 'appointment-cancel', 'POST', 'patient',
+                                f'appointments/{active}/cancel/', writes=True))
+        elif pending:
+            # Admins may cancel too, which keeps the route covered when the
+            # sampled patient has nothing left to cancel.
+            probes.append(Probe('cancel', 'appointment-cancel', 'POST', 'admin',
+                                f'appointments/{pending[0]}/cancel/', writes=True))
+        return probes
+
+    def _measure(self, probe, tokens, iterations, warmup):
+        client = APIClient()
+        if probe.caller:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens[probe.caller]}')
+        path = f'/api/{probe.path}'
+
+        def send():
+            method = getattr(client, probe.method.lower())
+            if probe.data is None:
+                response = method(path)
+            else:
+                data = probe.data() if callable(probe.data) else probe.data
+                response = method(path, data, format=probe.format)
+            if response.streaming:
+                # Time the whole body, not just the first byte.
+                b''.join(response.streaming_content)
+            return response
+
+        def once():
+            if not probe.writes:
+                return send()
+            with transaction.atomic():
+                response = send()
+                transaction.set_rollback(True)
+            return response
+
+        for _ in range(warmup):
+            once()
+        latencies = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = once()
+                latencies.append(time.perf_counter() - started)
+        ordered = sorted(latencies)
+        return {
+            'label': probe.label,
+            'route': probe.route,
+            'method': probe.method,
+            'path': path,
+            'caller': probe.caller,
+            'status': response.status_code,
+            # Writes include their SAVEPOINT/ROLLBACK statements.
+            'queries': len(queries.captured_queries),
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+            'max_ms': round(ordered[-1] * 1000, 2),
+        }
+
+    def _dataset(self):
+        totals = counters.snapshot(doctor__isnull=True)
+        # Slots are only counted per doctor.
+        slots = DashboardCounter.objects.filter(key=counters.SLOTS).aggregate(total=Sum('value'))['total']
+        return {
+            'patients': totals.get(counters.PATIENTS, 0),
+            'doctors': totals.get(counters.DOCTORS, 0),
+            'slots': slots or 0,
+            'appointments': totals.get(counters.APPOINTMENTS, 0),
+        }
+
+    def _print(self, results):
+        self.stdout.write(f'{"probe":<34}{"status":>7}{"queries":>8}{"p50":>10}{"p95":>10}{"p99":>10}')
+        for row in results:
+            self.stdout.write(
+                f'{row["label"]:<34}{row["status"]:>7}{row["queries"]:>8}'
+                f'{row["p50_ms"]:>8.1f}ms{row["p95_ms"]:>8.1f}ms{row["p99_ms"]:>8.1f}ms'
+            )
+
+    def _compare(self, path, results):
+        with open(path) as handle:
+            previous = {row['label']: row for row in json.load(handle)['results']}
+        self.stdout.write(f'\nAgainst {path}:')
+        self.stdout.write(f'{"probe":<34}{"p95 change":>12}{"queries":>10}')
+        for row in results:
+            before = previous.get(row['label'])
+            if before is None:
+                self.stdout.write(f'{row["label"]:<34}{"new":>12}')
+                continue
+            p95 = row['p95_ms'] - before['p95_ms']
+            ratio = f'{p95:+.1f}ms' if not before['p95_ms'] else f'{p95 / before["p95_ms"]:+.0%}'
+            queries = row['queries'] - before['queries']
+            line = f'{row["label"]:<34}{ratio:>12}{queries:>+10}'
+            self.stdout.write(self.style.WARNING(line) if queries > 0 else line)
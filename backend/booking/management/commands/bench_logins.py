@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from booking.benchmarking import cores, summarize
+
+LOGIN_PATHS = {
+    'patient': '/api/patient/login',
+    'doctor': '/api/doctor/login',
+    'admin': '/api/admin/login',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures login throughput (logins per second per core) by signing in '
+        'repeatedly from concurrent threads through the real login endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', choices=sorted(LOGIN_PATHS), default='doctor')
+        parser.add_argument('--email', default='doctor1@hospital.com', help='Defaults to a setup_data doctor.')
+        parser.add_argument(
+            '--password',
+            default=os.environ.get('SEED_DOCTOR_PASSWORD'),
+            help='Defaults to SEED_DOCTOR_PASSWORD.',
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        if not options['password']:
+            raise CommandError('Pass --password or set SEED_DOCTOR_PASSWORD.')
+        path = LOGIN_PATHS[options['role']]
+        payload = {'email': options['email'], 'password': options['password']}
+        total = options['requests']
+        concurrency = min(options['concurrency'], total)
+
+        latencies = []
+        errors = []
+        remaining = iter(range(total))
+        lock = threading.Lock()
+
+        def worker():
+            client = APIClient()
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    started = time.perf_counter()
+                    response = client.post(path, payload, format='json')
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        if response.status_code == 200:
+                            latencies.append(elapsed)
+                        else:
+                            errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            # One warm-up login, which also catches bad credentials early.
+            response = APIClient().post(path, payload, format='json')
+            if response.status_code != 200:
+                raise CommandError(f'Login failed with {response.status_code}: {response.content[:200]!r}')
+
+            threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - started
+
+        stats = summarize(latencies, wall)
+        cpus = cores()
+        self.stdout.write(f'{stats["requests"]} logins in {wall:.2f}s with {concurrency} threads on {cpus} cores')
+        self.stdout.write(f'  throughput     {stats["rps"]:.1f} logins/s')
+        self.stdout.write(f'  per core       {stats["rps"] / cpus:.1f} logins/s')
+        self.stdout.write(f'  latency        p50 {stats["p50_ms"]:.0f}ms  p95 {stats["p95_ms"]:.0f}ms')
+        if errors:
+            self.stdout.write(self.style.WARNING(
+                f'  {len(errors)} failed: ' + ', '.join(f'{code} x{errors.count(code)}' for code in sorted(set(errors)))
+            ))
@@ -0,0 +1,87 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from booking import fastpath, renderers
+from booking.models import Appointment, Slot
+from booking.renderers import FastJSONRenderer
+from booking.serializers import AppointmentSerializer, SlotSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Microbenchmark of list serialization: rows per second for the DRF '
+        'serializers against the values() fast path behind ?compact=true, and '
+        "for DRF's JSON renderer against the orjson renderer. Fetching, building "
+        'and rendering are timed separately on the current dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per run.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the median is reported.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        appointments = (
+            Appointment.objects
+            .select_related('patient', 'doctor__user', 'slot__doctor__user')
+            .with_slot_booking_state()
+            .order_by('-created_at', 'id')
+        )
+        slots = Slot.objects.select_related('doctor__user').with_booking_state().order_by('date', 'start_time', 'id')
+        if not appointments.exists():
+            raise CommandError('Generate a dataset first (manage.py generate_dataset).')
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; the fast renderer falls back to DRF.'))
+
+        cases = [
+            ('appointments', 'serializer', lambda: list(appointments[:rows]),
+             lambda page: AppointmentSerializer(page, many=True).data),
+            ('appointments', 'fastpath', lambda: list(fastpath.appointment_values(appointments)[:rows]),
+             lambda page: self.compact(*fastpath.appointment_page(page))),
+            ('slots', 'serializer', lambda: list(slots[:rows]),
+             lambda page: SlotSerializer(page, many=True).data),
+            ('slots', 'fastpath', lambda: list(fastpath.slot_values(slots)[:rows]),
+             lambda page: self.compact(*fastpath.slot_page(page))),
+        ]
+        self.stdout.write(f'{rows} rows per run, median of {repeat}; figures in rows per second')
+        self.stdout.write(
+            f'{"list":<14}{"builder":<12}{"fetch":>10}{"build":>10}{"render drf":>12}{"render orjson":>15}'
+            f'{"total":>10}{"bytes/row":>11}'
+        )
+        for name, builder, fetch, build in cases:
+            timings = {'fetch': [], 'build': [], 'drf': [], 'orjson': []}
+            for _ in range(repeat):
+                started = time.perf_counter()
+                page = fetch()
+                fetched = time.perf_counter()
+                data = build(page)
+                built = time.perf_counter()
+                JSONRenderer().render(data)
+                rendered = time.perf_counter()
+                body = FastJSONRenderer().render(data)
+                fast_rendered = time.perf_counter()
+                timings['fetch'].append(fetched - started)
+                timings['build'].append(built - fetched)
+                timings['drf'].append(rendered - built)
+                timings['orjson'].append(fast_rendered - rendered)
+            count = len(page)
+            median = {key: statistics.median(values) for key, values in timings.items()}
+            fast_renderer = 'orjson' if builder == 'fastpath' else 'drf'
+            total = median['fetch'] + median['build'] + median[fast_renderer]
+            self.stdout.write(
+                f'{name:<14}{builder:<12}{self.rate(count, median["fetch"]):>10}{self.rate(count, median["build"]):>10}'
+                f'{self.rate(count, median["drf"]):>12}{self.rate(count, median["orjson"]):>15}'
+                f'{self.rate(count, total):>10}{len(body) // max(count, 1):>11}'
+            )
+        self.stdout.write('total: fetch + build + render, with DRF rendering for the serializers and orjson for the fast path.')
+
+    @staticmethod
+    def compact(results, doctors):
+        return {'results': results, 'doctors': doctors}
+
+    @staticmethod
+    def rate(count, seconds):
+        return f'{count / seconds:,.0f}' if seconds else '-'
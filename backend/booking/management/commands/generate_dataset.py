@@ -0,0 +1,227 @@
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, time as clock, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from booking import accounts, counters, rollups
+from booking.management.commands.setup_data import SPECIALIZATIONS
+from booking.models import Appointment, Slot, User
+
+DEFAULT_PASSWORD = 'Synthetic-Data-2024'
+
+FIRST_NAMES = [
+    'Aarav', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Nikhil', 'Priya', 'Rahul',
+    'Riya', 'Rohan', 'Saanvi', 'Sahil', 'Sneha', 'Tanvi', 'Varun', 'Vikram', 'Zara', 'Aditya',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Kapoor', 'Mehta', 'Rao', 'Das',
+    'Joshi', 'Pillai', 'Bose', 'Chopra', 'Menon', 'Patel', 'Singh', 'Kulkarni', 'Shetty', 'Naidu',
+]
+
+# Working day of 30-minute slots, 09:00-17:00.
+DAY_STARTS = [clock(9 + minutes // 60, minutes % 60) for minutes in range(0, 8 * 60, 30)]
+
+# Status mix by whether the slot is already in the past.
+PAST_STATUSES = [
+    (Appointment.Status.COMPLETED, 70),
+    (Appointment.Status.CANCELLED, 15),
+    (Appointment.Status.APPROVED, 10),
+    (Appointment.Status.REJECTED, 5),
+]
+FUTURE_STATUSES = [
+    (Appointment.Status.APPROVED, 45),
+    (Appointment.Status.PENDING, 40),
+    (Appointment.Status.CANCELLED, 10),
+    (Appointment.Status.REJECTED, 5),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates a large synthetic dataset (patients, doctors, slots, appointments) '
+        'with batched inserts, for benchmarking and query-plan checks. All generated '
+        'accounts share one password and an email domain that marks them as synthetic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=50_000)
+        parser.add_argument('--doctors', type=int, default=2_000)
+        parser.add_argument('--slots', type=int, default=5_000_000, help='Total slots across all doctors.')
+        parser.add_argument('--appointments', type=int, default=2_000_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--email-domain', default='synthetic.test')
+
+    def handle(self, *args, **options):
+        # Checked before anything is written. Slots need a doctor, and the
+        # closing message signs in as doctor1 and patient1.
+        for name in ('patients', 'doctors', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} must be at least 1.')
+        for name in ('slots', 'appointments'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} must not be negative.')
+        if options['appointments'] > options['slots']:
+            raise CommandError('Each appointment needs its own slot; lower --appointments.')
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        domain = options['email_domain']
+        if User.objects.filter(email__endswith=f'@{domain}').exists():
+            raise CommandError(f'Synthetic users @{domain} already exist; pass another --email-domain.')
+
+        # Hashing once instead of per user keeps generation I/O bound.
+        self.password_hash = make_password(options['password'])
+
+        with self.phase('users'):
+            User.objects.create_user(
+                username=f'admin@{domain}',
+                email=f'admin@{domain}',
+                password=options['password'],
+                role=User.Roles.ADMIN,
+            )
+            doctor_ids = self.create_doctors(options['doctors'], domain)
+            patient_ids = self.create_patients(options['patients'], domain)
+        with self.phase('slots'):
+            per_doctor = math.ceil(options['slots'] / len(doctor_ids))
+            self.create_slots(doctor_ids, per_doctor, options['slots'])
+        with self.phase('appointments'):
+            self.create_appointments(doctor_ids, patient_ids, per_doctor, options['appointments'])
+        with self.phase('counters'):
+            counters.rebuild(counters.compute_expected())
+            rollups.rebuild(rollups.compute_expected())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. Sign in as admin@{domain}, doctor1@{domain} or patient1@{domain} '
+            f'with password {options["password"]!r}.'
+        ))
+
+    @contextmanager
+    def phase(self, name):
+        self.stdout.write(f'Generating {name}...')
+        started = time.perf_counter()
+        yield
+        self.stdout.write(f'  {name} done in {time.perf_counter() - started:.1f}s')
+
+    def batches(self, items):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def name(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def create_accounts(self, create, rows):
+        """Create the accounts for ``rows`` in batches and return the profile ids in order."""
+        ids = []
+        for batch in self.batches(rows):
+            with transaction.atomic():
+                ids.extend(profile.pk for profile in create(batch, self.password_hash))
+        return ids
+
+    def create_doctors(self, count, domain):
+        rows = (
+            {
+                'email': f'doctor{i}@{domain}',
+                'name': f'Dr. {self.name()}',
+                'specialization': self.random.choice(SPECIALIZATIONS),
+                'phone': f'+91{9000000000 + i - 1}',
+            }
+            for i in range(1, count + 1)
+        )
+        return self.create_accounts(accounts.create_doctors, rows)
+
+    def create_patients(self, count, domain):
+        rows = (
+            {
+                'email': f'patient{i}@{domain}',
+                'full_name': self.name(),
+                'age': self.random.randint(1, 90),
+                'gender': self.random.choice(['Male', 'Female']),
+                'phone': f'+91{8000000000 + i - 1}',
+            }
+            for i in range(1, count + 1)
+        )
+        return self.create_accounts(accounts.create_patients, rows)
+
+    def create_slots(self, doctor_ids, per_doctor, total):
+        # Half the calendar is in the past, half ahead, centred on today.
+        days = math.ceil(per_doctor / len(DAY_STARTS))
+        first_day = date.today() - timedelta(days=days // 2)
+
+        def rows():
+            remaining = total
+            for doctor_id in doctor_ids:
+                for n in range(min(per_doctor, remaining)):
+                    start = DAY_STARTS[n % len(DAY_STARTS)]
+                    yield Slot(
+                        doctor_id=doctor_id,
+                        date=first_day + timedelta(days=n // len(DAY_STARTS)),
+                        start_time=start,
+                        end_time=clock(start.hour + (start.minute + 30) // 60, (start.minute + 30) % 60),
+                    )
+                remaining -= per_doctor
+                if remaining <= 0:
+                    return
+
+        for number, batch in enumerate(self.batches(rows()), 1):
+            with transaction.atomic():
+                Slot.objects.bulk_create(batch)
+            if number % 100 == 0:
+                self.stdout.write(f'  {number * self.batch_size:,} slots')
+
+    def quotas(self, doctor_ids, per_doctor, total):
+        """Split ``total`` appointments across doctors with a long-tailed popularity."""
+        order = list(doctor_ids)
+        self.random.shuffle(order)
+        weights = [1 / (rank + 1) ** 0.6 for rank in range(len(order))]
+        scale = total / sum(weights)
+        quotas = {doctor_id: min(per_doctor, int(weight * scale)) for doctor_id, weight in zip(order, weights)}
+        shortfall = total - sum(quotas.values())
+        for doctor_id in order:
+            if shortfall <= 0:
+                break
+            extra = min(per_doctor - quotas[doctor_id], shortfall)
+            quotas[doctor_id] += extra
+            shortfall -= extra
+        return quotas
+
+    def create_appointments(self, doctor_ids, patient_ids, per_doctor, total):
+        today = date.today()
+        quotas = self.quotas(doctor_ids, per_doctor, total)
+
+        def status_for(day):
+            mix = PAST_STATUSES if day < today else FUTURE_STATUSES
+            return self.random.choices([s for s, _ in mix], weights=[w for _, w in mix])[0]
+
+        def rows():
+            for doctor_id in doctor_ids:
+                quota = quotas[doctor_id]
+                if not quota:
+                    continue
+                slots = list(Slot.objects.filter(doctor_id=doctor_id).values_list('id', 'date'))
+                for slot_id, day in self.random.sample(slots, min(quota, len(slots))):
+                    # Squaring skews bookings towards a core of returning patients.
+                    patient_id = patient_ids[int(len(patient_ids) * self.random.random() ** 2)]
+                    yield Appointment(
+                        patient_id=patient_id,
+                        doctor_id=doctor_id,
+                        slot_id=slot_id,
+                        status=status_for(day),
+                    )
+
+        for number, batch in enumerate(self.batches(rows()), 1):
+            with transaction.atomic():
+                Appointment.objects.bulk_create(batch)
+            if number % 100 == 0:
+                self.stdout.write(f'  {number * self.batch_size:,} appointments')
@@ -0,0 +1,49 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking import imports
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates doctors or patients in bulk from a CSV file, in batches. Rows that '
+        'fail validation or whose email already exists are reported and skipped. '
+        'Accounts get IMPORT_INITIAL_PASSWORD, or an unusable password when it is unset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(imports.IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=imports.BATCH_SIZE)
+        parser.add_argument('--report', help='Write the full JSON report to this file.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        importer = imports.IMPORTERS[options['kind']](
+            os.environ.get('IMPORT_INITIAL_PASSWORD'),
+            batch_size=options['batch_size'],
+        )
+        started = time.perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as handle:
+                report = importer.run(handle)
+        except OSError as exc:
+            raise CommandError(f'Could not open {options["path"]}: {exc}')
+        except imports.ImportFormatError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        if options['report']:
+            with open(options['report'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+        for error in report['errors'][:20]:
+            self.stdout.write(self.style.WARNING(f'line {error["line"]} ({error["email"]}): {json.dumps(error["errors"])}'))
+        if report['failed'] > 20:
+            self.stdout.write(self.style.WARNING(f'... {report["failed"] - 20} more failed rows.'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {report["created"]} {options["kind"]}, {report["failed"]} failed, in {elapsed:.1f}s.'
+        ))
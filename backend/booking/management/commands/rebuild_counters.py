@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from booking import counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the dashboard counters from the source tables and verifies them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report counters that disagree with the source tables; exit non-zero on drift.',
+        )
+
+    def handle(self, *args, **options):
+        expected = counters.compute_expected()
+        mismatches = counters.drift(expected, counters.stored())
+
+        for doctor_id, key, actual, value in mismatches:
+            scope = f'doctor {doctor_id}' if doctor_id else 'global'
+            self.stdout.write(self.style.WARNING(f'{scope} {key}: stored {actual}, expected {value}'))
+
+        if options['check']:
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} counters drifted.')
+            self.stdout.write(self.style.SUCCESS(f'All {len(expected)} counters match.'))
+            return
+
+        counters.rebuild(expected)
+        remaining = counters.drift(counters.compute_expected(), counters.stored())
+        if remaining:
+            raise CommandError(
+                f'{len(remaining)} counters changed while rebuilding; rerun the command.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(expected)} counters ({len(mismatches)} corrected).'
+        ))
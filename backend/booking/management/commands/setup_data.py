@@ -1,15 +1,59 @@
+import csv
+import json
 import os
+import time
+from pathlib import Path
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
 
-from booking.models import Doctor
+from booking import accounts
+from booking.serializers import DoctorImportRowSerializer
 
 User = get_user_model()
 
+SPECIALIZATIONS = [
+    'Cardiology',
+    'Neurology',
+    'Orthopedics',
+    'Pediatrics',
+    'Dermatology',
+    'Oncology',
+    'Psychiatry',
+    'Gynecology',
+    'Urology',
+    'Ophthalmology',
+    'ENT (Ear, Nose, Throat)',
+    'General Medicine',
+    'Emergency Medicine',
+    'Radiology',
+    'Anesthesiology',
+    'Internal Medicine',
+    'Surgery',
+    'Gastroenterology',
+    'Pulmonology',
+    'Endocrinology',
+]
+
 
 class Command(BaseCommand):
-    help = 'Creates an admin user and sample doctors from environment-provided credentials.'
+    help = (
+        'Creates an admin user and doctors from environment-provided credentials. '
+        'Doctors come from --roster (CSV or JSON with email, name, specialization and '
+        'optional phone) or, without one, a sample doctor per specialization. Existing '
+        'emails are skipped, so the command can be re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--roster',
+            type=Path,
+            help='CSV with a header row, or a JSON list of objects: email, name, specialization, phone.',
+        )
 
     def handle(self, *args, **options):
         admin_email = os.environ.get('SEED_ADMIN_EMAIL')
@@ -21,6 +65,9 @@ class Command(BaseCommand):
                 'SEED_ADMIN_EMAIL, SEED_ADMIN_PASSWORD, and SEED_DOCTOR_PASSWORD are required.'
             )
 
+        started = time.perf_counter()
+        roster = self.read_roster(options['roster']) if options['roster'] else self.sample_roster()
+
         if not User.objects.filter(email=admin_email).exists():
             User.objects.create_user(
                 username=admin_email,
@@ -35,59 +82,83 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING(f'Admin user already exists: {admin_email}'))
 
-        specializations = [
-            'Cardiology',
-            'Neurology',
-            'Orthopedics',
-            'Pediatrics',
-            'Dermatology',
-            'Oncology',
-            'Psychiatry',
-            'Gynecology',
-            'Urology',
-            'Ophthalmology',
-            'ENT (Ear, Nose, Throat)',
-            'General Medicine',
-            'Emergency Medicine',
-            'Radiology',
-            'Anesthesiology',
-            'Internal Medicine',
-            'Surgery',
-            'Gastroenterology',
-            'Pulmonology',
-            'Endocrinology',
-        ]
+        emails = [row['email'] for row in roster]
+        # Accounts use the email as username too, so either one being taken skips the row.
+        taken = User.objects.filter(Q(email__in=emails) | Q(username__in=emails)).values_list('email', 'username')
+        existing = {value for pair in taken for value in pair} & set(emails)
+        new_rows = [row for row in roster if row['email'] not in existing]
+        for email in sorted(existing):
+            self.stdout.write(self.style.WARNING(f'Doctor already exists: {email}'))
 
-        doctors_created = 0
-        doctors_skipped = 0
+        if new_rows:
+            # Every seeded doctor starts with the same password, so one hash serves them all.
+            password_hash = make_password(doctor_password)
+            try:
+                with transaction.atomic():
+                    accounts.create_doctors(new_rows, password_hash)
+            except IntegrityError as exc:
+                raise CommandError(f'Nothing was created; another process added one of these users ({exc}). Re-run to skip them.')
+            if options['verbosity'] > 1:
+                for row in new_rows:
+                    self.stdout.write(self.style.SUCCESS(f'Created doctor: {row["name"]} - {row["specialization"]}'))
 
-        for i, specialization in enumerate(specializations, 1):
-            doctor_email = f'doctor{i}@hospital.com'
-            doctor_name = f'Dr. {specialization.split()[0]} Specialist {i}'
-            doctor_phone = f'+123456789{i:02d}'
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('Setup complete.'))
+        self.stdout.write(self.style.SUCCESS(f'Created {len(new_rows)} new doctors.'))
+        if existing:
+            self.stdout.write(self.style.WARNING(f'Skipped {len(existing)} existing doctors.'))
+        self.stdout.write(f'Finished in {time.perf_counter() - started:.2f}s.')
 
-            if User.objects.filter(email=doctor_email).exists():
-                doctors_skipped += 1
-                self.stdout.write(self.style.WARNING(f'Doctor already exists: {doctor_email}'))
-                continue
+    def sample_roster(self):
+        return [
+            {
+                'email': f'doctor{i}@hospital.com',
+                'name': f'Dr. {specialization.split()[0]} Specialist {i}',
+                'specialization': specialization,
+                'phone': f'+123456789{i:02d}',
+            }
+            for i, specialization in enumerate(SPECIALIZATIONS, 1)
+        ]
 
-            user = User.objects.create_user(
-                username=doctor_email,
-                email=doctor_email,
-                password=doctor_password,
-                role=User.Roles.DOCTOR,
-            )
-            Doctor.objects.create(
-                user=user,
-                name=doctor_name,
-                specialization=specialization,
-                phone=doctor_phone,
-            )
-            doctors_created += 1
-            self.stdout.write(self.style.SUCCESS(f'Created doctor: {doctor_name} - {specialization}'))
+    def read_roster(self, path):
+        try:
+            with path.open(newline='', encoding='utf-8-sig') as handle:
+                if path.suffix.lower() == '.csv':
+                    records = list(csv.DictReader(handle))
+                elif path.suffix.lower() == '.json':
+                    records = json.load(handle)
+                else:
+                    raise CommandError('The roster must be a .csv or .json file.')
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Could not read roster {path}: {exc}')
+        if not isinstance(records, list):
+            raise CommandError('A JSON roster must be a list of objects.')
 
-        self.stdout.write('')
-        self.stdout.write(self.style.SUCCESS('Setup complete.'))
-        self.stdout.write(self.style.SUCCESS(f'Created {doctors_created} new doctors.'))
-        if doctors_skipped:
-            self.stdout.write(self.style.WARNING(f'Skipped {doctors_skipped} existing doctors.'))
+        rows = []
+        seen = set()
+        errors = []
+        # The bulk import's row rules, which also hold each value to its column's length.
+        validator = DoctorImportRowSerializer()
+        for number, record in enumerate(records, 1):
+            if not isinstance(record, dict):
+                errors.append(f'entry {number}: expected an object')
+                continue
+            # JSON may give null or a number where CSV gives text.
+            record = {field: str(record.get(field) or '') for field in validator.fields}
+            try:
+                row = validator.run_validation(record)
+            except serializers.ValidationError as exc:
+                problems = serializers.as_serializer_error(exc)
+                errors.append(f'entry {number}: ' + '; '.join(
+                    f'{field}: {" ".join(messages)}' for field, messages in problems.items()
+                ))
+                continue
+            if row['email'] in seen:
+                self.stdout.write(self.style.WARNING(f'entry {number}: duplicate of an earlier {row["email"]}, ignored'))
+                continue
+            seen.add(row['email'])
+            rows.append(row)
+
+        if errors:
+            raise CommandError('Invalid roster, nothing was created:\n' + '\n'.join(errors))
+        return rows
@@ -0,0 +1,20 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def backfill_created_at(apps, schema_editor):
+    # Cursor pagination keys appointments on created_at; rows that predate
+    # the column would otherwise carry a NULL position.
+    Appointment = apps.get_model('booking', 'Appointment')
+    Appointment.objects.filter(created_at__isnull=True).update(created_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_alter_appointment_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_backfill_appointment_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['doctor', 'date', 'start_time'], name='slot_doctor_date_start_idx'),
+        ),
+    ]
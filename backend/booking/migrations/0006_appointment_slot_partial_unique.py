@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_slot_doctor_date_start_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='slot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='booking.slot'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('PENDING', 'APPROVED', 'COMPLETED'))), fields=('slot',), name='unique_active_appointment_per_slot'),
+        ),
+    ]
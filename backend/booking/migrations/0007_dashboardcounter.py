@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    Appointment = apps.get_model('booking', 'Appointment')
+    DashboardCounter = apps.get_model('booking', 'DashboardCounter')
+    Doctor = apps.get_model('booking', 'Doctor')
+    Patient = apps.get_model('booking', 'Patient')
+    Slot = apps.get_model('booking', 'Slot')
+
+    values = {(doctor_id, 'APPOINTMENTS'): 0 for doctor_id in Doctor.objects.values_list('id', flat=True)}
+    for row in Appointment.objects.values('doctor_id', 'status').annotate(total=Count('id')).order_by():
+        for scope in (row['doctor_id'], None):
+            for key in (row['status'], 'APPOINTMENTS'):
+                values[(scope, key)] = values.get((scope, key), 0) + row['total']
+    for row in Slot.objects.values('doctor_id').annotate(total=Count('id')).order_by():
+        values[(row['doctor_id'], 'SLOTS')] = row['total']
+    values[(None, 'PATIENTS')] = Patient.objects.count()
+    values[(None, 'DOCTORS')] = Doctor.objects.count()
+
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(doctor_id=doctor_id, key=key, value=value) for (doctor_id, key), value in values.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_appointment_slot_partial_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('doctor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='booking.doctor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', '-value'], name='counter_key_value_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('doctor__isnull', False)), fields=('doctor', 'key'), name='unique_doctor_counter'), models.UniqueConstraint(condition=models.Q(('doctor__isnull', True)), fields=('key',), name='unique_global_counter')],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """``CREATE INDEX CONCURRENTLY`` on PostgreSQL, so the build does not block
+    writes to the large tables; a plain ``AddIndex`` on other databases.
+
+    If a concurrent build fails it leaves an INVALID index behind; drop it
+    before re-running the migration.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('booking', '0007_dashboardcounter'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='appointment',
+            index=models.Index(fields=['patient', '-created_at'], name='appt_patient_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', '-created_at'], name='appt_doctor_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='appointment',
+            index=models.Index(fields=['status', '-created_at'], name='appt_status_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'status'], name='appt_doctor_status_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['doctor', '-created_at'], name='appt_doctor_pending_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='slot',
+            index=models.Index(fields=['date'], name='slot_date_idx'),
+        ),
+        # Drop the single-column FK indexes only once their replacements exist.
+        migrations.AlterField(
+            model_name='appointment',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='booking.doctor'),
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='patient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='booking.patient'),
+        ),
+        migrations.AlterField(
+            model_name='slot',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='booking.doctor'),
+        ),
+    ]
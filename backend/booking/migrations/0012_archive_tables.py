@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_appointment_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('slot_id', models.BigIntegerField()),
+                ('slot_date', models.DateField()),
+                ('slot_start_time', models.TimeField()),
+                ('slot_end_time', models.TimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('CANCELLED', 'Cancelled'), ('COMPLETED', 'Completed')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='booking.doctor')),
+                ('patient', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='booking.patient')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['patient', '-created_at'], name='archived_appt_patient_idx'), models.Index(fields=['doctor', '-created_at'], name='archived_appt_doctor_idx'), models.Index(fields=['status', '-created_at'], name='archived_appt_status_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSlot',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_slots', to='booking.doctor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctor', 'date', 'start_time'], name='archived_slot_doctor_date_idx')],
+            },
+        ),
+    ]
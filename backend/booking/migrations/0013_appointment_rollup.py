@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_rollups(apps, schema_editor):
+    Appointment = apps.get_model('booking', 'Appointment')
+    ArchivedAppointment = apps.get_model('booking', 'ArchivedAppointment')
+    AppointmentRollup = apps.get_model('booking', 'AppointmentRollup')
+
+    values = {}
+    for model, day in ((Appointment, 'slot__date'), (ArchivedAppointment, 'slot_date')):
+        for row in model.objects.values(day, 'doctor_id', 'status').annotate(total=Count('id')).order_by():
+            key = (row[day], row['doctor_id'], row['status'])
+            values[key] = values.get(key, 0) + row['total']
+
+    AppointmentRollup.objects.bulk_create(
+        [AppointmentRollup(day=day, doctor_id=doctor_id, status=status, count=count)
+         for (day, doctor_id, status), count in values.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('CANCELLED', 'Cancelled'), ('COMPLETED', 'Completed')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('doctor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='booking.doctor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctor', 'day'], name='rollup_doctor_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'doctor', 'status'), name='unique_appointment_rollup')],
+            },
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
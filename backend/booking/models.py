@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
 from django.contrib.auth.models import AbstractUser
 
 
@@ -14,6 +15,12 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Login looks users up by email within a role.
+            models.Index(fields=['email', 'role'], name='user_email_role_idx'),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
@@ -44,22 +51,53 @@ class Doctor(models.Model):
         return f"{self.name} - {self.specialization}"
 
 
+# Statuses that hold a slot. Rejected and cancelled appointments release it
+# so the slot can be booked again.
+ACTIVE_APPOINTMENT_STATUSES = ('PENDING', 'APPROVED', 'COMPLETED')
+
+
+class SlotQuerySet(models.QuerySet):
+    def with_booking_state(self):
+        """Annotate ``is_booked`` with a single correlated EXISTS per query."""
+        booked = Appointment.objects.filter(slot=OuterRef('pk'), status__in=ACTIVE_APPOINTMENT_STATUSES)
+        return self.annotate(is_booked=Exists(booked))
+
+
 class Slot(models.Model):
-    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='slots')
+    # Covered by slot_doctor_date_start_idx and the unique_together index.
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='slots', db_index=False)
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SlotQuerySet.as_manager()
+
     class Meta:
         ordering = ['date', 'start_time']
         unique_together = ('doctor', 'date', 'start_time', 'end_time')
+        indexes = [
+            models.Index(fields=['doctor', 'date', 'start_time'], name='slot_doctor_date_start_idx'),
+            # Admin appointment filter on slot__date.
+            models.Index(fields=['date'], name='slot_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.doctor.name} - {self.date} {self.start_time}-{self.end_time}"
 
 
+class AppointmentQuerySet(models.QuerySet):
+    def with_slot_booking_state(self):
+        """Annotate ``slot_taken_by_other``: another active appointment holds the slot."""
+        others = (
+            Appointment.objects
+            .filter(slot=OuterRef('slot'), status__in=ACTIVE_APPOINTMENT_STATUSES)
+            .exclude(pk=OuterRef('pk'))
+        )
+        return self.annotate(slot_taken_by_other=Exists(others))
+
+
 class Appointment(models.Model):
     class Status(models.TextChoices):
         PENDING = 'PENDING', 'Pending'
@@ -68,15 +106,160 @@ class Appointment(models.Model):
         CANCELLED = 'CANCELLED', 'Cancelled'
         COMPLETED = 'COMPLETED', 'Completed'
 
-    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='appointments')
-    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='appointments')
-    slot = models.OneToOneField(Slot, on_delete=models.CASCADE, related_name='appointment')
+    # The composite indexes below lead with these columns, so the default
+    # single-column FK indexes would only add write cost.
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='appointments', db_index=False)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='appointments', db_index=False)
+    slot = models.ForeignKey(Slot, on_delete=models.CASCADE, related_name='appointments')
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AppointmentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # Only active appointments occupy a slot; this partial index also
+            # serves the booked/free EXISTS lookups.
+            models.UniqueConstraint(
+                fields=['slot'],
+                condition=Q(status__in=ACTIVE_APPOINTMENT_STATUSES),
+                name='unique_active_appointment_per_slot',
+            ),
+        ]
+        indexes = [
+            # Appointment lists: scoped by role, ordered by the (-created_at, id) cursor.
+            models.Index(fields=['patient', '-created_at'], name='appt_patient_created_idx'),
+            models.Index(fields=['doctor', '-created_at'], name='appt_doctor_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='appt_status_created_idx'),
+            # Admin doctor_id + status filters and per-doctor status aggregates.
+            models.Index(fields=['doctor', 'status'], name='appt_doctor_status_idx'),
+            # Doctors' pending triage queue; pending rows are a small slice of the table.
+            models.Index(
+                fields=['doctor', '-created_at'],
+                condition=Q(status='PENDING'),
+                name='appt_doctor_pending_idx',
+            ),
+            # The updated_after filter, e.g. the frontend's notifications.
+            models.Index(fields=['updated_at'], name='appt_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Appointment {self.id} - {self.patient.full_name} with {self.doctor.name} ({self.status})"
+
+
+class DashboardCounter(models.Model):
+    """Running total read by the dashboards. ``doctor`` is NULL for hospital-wide counters.
+
+    Rows are maintained by ``booking.counters`` in the same transaction as the
+    change they count; ``manage.py rebuild_counters`` recomputes them.
+    """
+
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, null=True, blank=True, related_name='counters')
+    key = models.CharField(max_length=32)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['doctor', 'key'],
+                condition=Q(doctor__isnull=False),
+                name='unique_doctor_counter',
+            ),
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=Q(doctor__isnull=True),
+                name='unique_global_counter',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['key', '-value'], name='counter_key_value_idx'),
+        ]
+
+    def __str__(self):
+        scope = self.doctor_id or 'global'
+        return f"{scope}:{self.key}={self.value}"
+
+
+class AppointmentRollup(models.Model):
+    """Appointments per slot date, doctor and status, read by the analytics trends.
+
+    Rows are maintained by ``booking.rollups`` alongside the dashboard
+    counters; ``manage.py rebuild_rollups`` recomputes them. Like the
+    counters they are all-time, so archived appointments stay counted.
+    """
+
+    day = models.DateField()
+    # Covered by rollup_doctor_day_idx.
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='rollups', db_index=False)
+    status = models.CharField(max_length=20, choices=Appointment.Status.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index for hospital-wide date ranges.
+            models.UniqueConstraint(fields=['day', 'doctor', 'status'], name='unique_appointment_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['doctor', 'day'], name='rollup_doctor_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.doctor_id}:{self.status}={self.count}"
+
+
+# Cold storage written by ``manage.py archive_history`` (booking.archive).
+# Rows keep their original ids, which the hot tables never reuse.
+
+class ArchivedSlot(models.Model):
+    """A past slot with no remaining hot appointments."""
+
+    id = models.BigIntegerField(primary_key=True)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='archived_slots', db_index=False)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['doctor', 'date', 'start_time'], name='archived_slot_doctor_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived slot {self.id} - {self.date} {self.start_time}-{self.end_time}"
+
+
+class ArchivedAppointment(models.Model):
+    """A finished (rejected, cancelled or completed) appointment whose slot date has passed.
+
+    The slot is copied in, since it may itself have been archived.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='archived_appointments', db_index=False)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='archived_appointments', db_index=False)
+    slot_id = models.BigIntegerField()
+    slot_date = models.DateField()
+    slot_start_time = models.TimeField()
+    slot_end_time = models.TimeField()
+    status = models.CharField(max_length=20, choices=Appointment.Status.choices)
+    # The merged list cursor orders on it, so unlike the hot table it is never NULL.
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Same list shapes as the hot table.
+            models.Index(fields=['patient', '-created_at'], name='archived_appt_patient_idx'),
+            models.Index(fields=['doctor', '-created_at'], name='archived_appt_doctor_idx'),
+            models.Index(fields=['status', '-created_at'], name='archived_appt_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived appointment {self.id} ({self.status})"
@@ -0,0 +1,200 @@
+import base64
+import heapq
+import json
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, _positive_int, _reverse_ordering
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(CursorPagination):
+    """DRF's cursor pagination, keyed on every ordering field rather than the first.
+
+    DRF filters on ``ordering[0]`` alone and skips the rows that share its
+    value with an offset. Here a cursor's position holds the row's whole
+    ordering key and pages continue strictly after it, compared as a tuple.
+    The last ordering field must be unique (``id``), so no two rows share a
+    position and the offset DRF falls back on stays zero.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # DRF's implementation with the position filter swapped for _after().
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = self._after(queryset, ordering, current_position)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _after(self, queryset, ordering, position):
+        """Rows that follow ``position`` in ``ordering``, the order the query runs in."""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError
+            # (a, b, c) > (x, y, z) as a > x OR a = x AND b > y OR ...; the
+            # leading bound lets an index on the first field narrow the scan.
+            fields = [(order.lstrip('-'), 'lt' if order.startswith('-') else 'gt') for order in ordering]
+            bound = {f'{fields[0][0]}__{fields[0][1]}e': values[0]}
+            after = Q()
+            equal = Q()
+            for (field, lookup), value in zip(fields, values):
+                after |= equal & Q(**{f'{field}__{lookup}': value})
+                equal &= Q(**{field: value})
+            return queryset.filter(after, **bound)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [order.lstrip('-') for order in ordering]
+        if isinstance(instance, dict):
+            return json.dumps([str(instance[name]) for name in names])
+        return json.dumps([str(getattr(instance, name)) for name in names])
+
+
+class IdCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over the primary key; the default for list endpoints."""
+
+    ordering = ('id',)
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class AppointmentCursorPagination(IdCursorPagination):
+    ordering = ('-created_at', 'id')
+
+
+class SlotCursorPagination(IdCursorPagination):
+    ordering = ('date', 'start_time', 'id')
+
+
+class MergedAppointmentPagination(BasePagination):
+    """The appointment cursor over several querysets at once, e.g. hot and archived rows.
+
+    Each page reads at most ``page_size + 1`` rows past the cursor from every
+    queryset, merges them on ``(-created_at, id)`` and keeps the first
+    ``page_size``. Ids are unique across the querysets, since archived rows
+    keep theirs. Only forward (``next``) links are given.
+    """
+
+    ordering = AppointmentCursorPagination.ordering
+    page_size = AppointmentCursorPagination.page_size
+    page_size_query_param = AppointmentCursorPagination.page_size_query_param
+    max_page_size = AppointmentCursorPagination.max_page_size
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_querysets(self, querysets, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        streams = []
+        for queryset in querysets:
+            if position is not None:
+                created_at, pk = position
+                queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__lte=pk)
+            streams.append(list(queryset.order_by(*self.ordering)[:size + 1]))
+        rows = list(heapq.merge(*streams, key=lambda row: (-row.created_at.timestamp(), row.id)))
+
+        self.has_next = len(rows) > size
+        self.page = rows[:size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            query = parse.parse_qs(base64.b64decode(encoded.encode('ascii')).decode('ascii'), strict_parsing=True)
+            created_at = parse_datetime(query['c'][0])
+            pk = int(query['i'][0])
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        query = parse.urlencode({'c': last.created_at.isoformat(), 'i': last.id})
+        encoded = base64.b64encode(query.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,62 @@
+"""Password verification with a cap on concurrent hashes.
+
+PBKDF2 is deliberately slow, and the request thread that asks for a hash
+is busy until it finishes. At most ``LOGIN_HASH_WORKERS`` logins hash at
+once, which settings keep below ``GUNICORN_THREADS``. A login that finds
+every slot taken waits up to ``LOGIN_HASH_WAIT_SECONDS`` for one to free
+up, which absorbs a short burst of sign-ins; only a login still waiting
+after that gets a 503 with ``Retry-After``, so a sustained burst cannot
+hold the web threads indefinitely.
+"""
+import math
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+from .exceptions import LoginBusy
+
+_lock = threading.Lock()
+_slots = None
+
+
+def _hash_slots():
+    global _slots
+    with _lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.LOGIN_HASH_WORKERS)
+    return _slots
+
+
+def _run(fn, *args):
+    slots = _hash_slots()
+    wait = settings.LOGIN_HASH_WAIT_SECONDS
+    if not slots.acquire(timeout=wait):
+        raise LoginBusy(retry_after=max(1, math.ceil(wait)))
+    try:
+        return fn(*args)
+    finally:
+        slots.release()
+
+
+def verify(user, raw_password):
+    """Check ``raw_password`` for ``user``, which may be ``None`` for an unknown email.
+
+    Unknown users still pay for one hash so response times do not reveal
+    which emails are registered.
+    """
+    if user is None:
+        _run(make_password, raw_password)
+        return False
+    if not _run(check_password, raw_password, user.password):
+        return False
+    if _needs_rehash(user.password):
+        # Mirrors AbstractBaseUser.check_password's upgrade of old hashes.
+        user.set_password(raw_password)
+        user.save(update_fields=['password'])
+    return True
+
+
+def _needs_rehash(encoded):
+    preferred = get_hasher('default')
+    return identify_hasher(encoded).algorithm != preferred.algorithm or preferred.must_update(encoded)
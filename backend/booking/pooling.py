@@ -0,0 +1,29 @@
+"""Connection pool metrics for the current process.
+
+With ``DATABASE_POOL`` on, every PostgreSQL alias has a psycopg pool per
+process. ``stats`` reports its counters (see psycopg_pool's
+``ConnectionPool.get_stats``): ``pool_size`` and ``pool_available`` are the
+connections open and idle now, ``requests_waiting`` the requests queued for
+one, and ``connections_num`` / ``connections_ms`` how many connections the
+pool has opened and how long that took in total. Without pooling an alias
+is reported with its ``CONN_MAX_AGE``.
+"""
+import os
+
+from django.db import connections
+
+
+def stats():
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+        if pool is None:
+            databases[alias] = {
+                'pooled': False,
+                'vendor': connection.vendor,
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            }
+        else:
+            databases[alias] = {'pooled': True, 'vendor': connection.vendor, **pool.get_stats()}
+    return {'pid': os.getpid(), 'databases': databases}
@@ -0,0 +1,31 @@
+"""A drop-in ``JSONRenderer`` that encodes with orjson when it is installed.
+
+Output matches DRF's renderer: dates, times, decimals and the like still go
+through DRF's encoder, and U+2028/U+2029 are escaped. Pretty-printed
+responses (``Accept: application/json; indent=4``) and installs without
+orjson use DRF's own encoding.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data,
+            default=_encoder.default,
+            # Keep DRF's date formats (``Z`` for UTC) and allow integer keys.
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,183 @@
+"""Appointment rollups: appointment counts per (slot date, doctor, status).
+
+Maintained like the dashboard counters: every helper here must be called
+inside the transaction that changes the appointments it counts, and
+``manage.py rebuild_rollups`` recomputes the rows from the source tables.
+Counts are all-time, so archiving appointments leaves them unchanged.
+
+``trends`` sums the rows into day, week or month buckets. A date range then
+costs at most days x doctors x statuses rows, however many appointments it
+covers.
+"""
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import Appointment, AppointmentRollup, ArchivedAppointment
+
+DAY = 'day'
+WEEK = 'week'
+MONTH = 'month'
+INTERVALS = (DAY, WEEK, MONTH)
+
+# group_by value -> rollup lookup
+GROUPS = {
+    'status': 'status',
+    'doctor': 'doctor_id',
+    'specialization': 'doctor__specialization',
+}
+
+
+def _add(deltas):
+    """Add ``deltas`` ({(day, doctor_id, status): delta}) to the rollup rows."""
+    # A fixed order keeps concurrent writers from locking rows in opposite orders.
+    for (day, doctor_id, status), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        row = AppointmentRollup.objects.filter(day=day, doctor_id=doctor_id, status=status)
+        if row.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                AppointmentRollup.objects.create(day=day, doctor_id=doctor_id, status=status, count=delta)
+        except IntegrityError:
+            # Another transaction created the row first.
+            row.update(count=F('count') + delta)
+
+
+def appointment_created(doctor_id, day, status):
+    _add({(day, doctor_id, status): 1})
+
+
+def appointments_moved(rows, new_status):
+    """Account for appointments given as ``(doctor_id, day, old_status)`` moving to ``new_status``."""
+    deltas = {}
+    for doctor_id, day, old_status in rows:
+        if old_status == new_status:
+            continue
+        deltas[(day, doctor_id, new_status)] = deltas.get((day, doctor_id, new_status), 0) + 1
+        deltas[(day, doctor_id, old_status)] = deltas.get((day, doctor_id, old_status), 0) - 1
+    _add(deltas)
+
+
+def appointments_removed(rows):
+    """Account for deleted appointments given as ``(doctor_id, day, status)``."""
+    deltas = {}
+    for doctor_id, day, status in rows:
+        deltas[(day, doctor_id, status)] = deltas.get((day, doctor_id, status), 0) - 1
+    _add(deltas)
+
+
+def compute_expected(date_from=None, date_to=None):
+    """Recompute the rollups from the source tables as {(day, doctor_id, status): count}."""
+    expected = {}
+    for model, day in ((Appointment, 'slot__date'), (ArchivedAppointment, 'slot_date')):
+        rows = model.objects.all()
+        if date_from:
+            rows = rows.filter(**{f'{day}__gte': date_from})
+        if date_to:
+            rows = rows.filter(**{f'{day}__lte': date_to})
+        for row in rows.values(day, 'doctor_id', 'status').annotate(total=Count('id')).order_by():
+            key = (row[day], row['doctor_id'], row['status'])
+            expected[key] = expected.get(key, 0) + row['total']
+    return expected
+
+
+def _stored_rows(date_from=None, date_to=None):
+    rows = AppointmentRollup.objects.all()
+    if date_from:
+        rows = rows.filter(day__gte=date_from)
+    if date_to:
+        rows = rows.filter(day__lte=date_to)
+    return rows
+
+
+def stored(date_from=None, date_to=None):
+    return {
+        (day, doctor_id, status): count
+        for day, doctor_id, status, count in
+        _stored_rows(date_from, date_to).values_list('day', 'doctor_id', 'status', 'count')
+    }
+
+
+def drift(expected, actual):
+    """List ``(day, doctor_id, status, actual, expected)`` for every rollup that disagrees.
+
+    Rows holding zero match a missing row.
+    """
+    return [
+        (*key, actual.get(key, 0), expected.get(key, 0))
+        for key in sorted(set(expected) | set(actual))
+        if actual.get(key, 0) != expected.get(key, 0)
+    ]
+
+
+@transaction.atomic
+def rebuild(expected, date_from=None, date_to=None):
+    """Replace the rollups between ``date_from`` and ``date_to`` (all when unset) with ``expected``."""
+    _stored_rows(date_from, date_to).delete()
+    AppointmentRollup.objects.bulk_create(
+        [
+            AppointmentRollup(day=day, doctor_id=doctor_id, status=status, count=count)
+            for (day, doctor_id, status), count in expected.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def bucket_start(day, interval):
+    if interval == WEEK:
+        return day - timedelta(days=day.weekday())
+    if interval == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def bucket_count(date_from, date_to, interval):
+    """How many buckets overlap ``date_from``..``date_to``, without walking them."""
+    if interval == MONTH:
+        return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+    if interval == WEEK:
+        return (bucket_start(date_to, WEEK) - bucket_start(date_from, WEEK)).days // 7 + 1
+    return (date_to - date_from).days + 1
+
+
+def bucket_starts(date_from, date_to, interval):
+    """Every bucket overlapping ``date_from``..``date_to``, by its first day."""
+    first = bucket_start(date_from, interval)
+    # Computed from the first bucket rather than stepped past the last one,
+    # which could run beyond date.max.
+    for index in range(bucket_count(date_from, date_to, interval)):
+        if interval == MONTH:
+            year, month = divmod(first.month - 1 + index, 12)
+            yield date(first.year + year, month + 1, 1)
+        else:
+            yield first + timedelta(days=index * (7 if interval == WEEK else 1))
+
+
+def trends(date_from, date_to, interval=DAY, group_by='status', **filters):
+    """Appointments by slot date between ``date_from`` and ``date_to``, bucketed and grouped.
+
+    Returns ``[{'bucket', 'total', 'counts': {group: count}}]`` with one entry
+    per bucket, empty ones included. Buckets at either end only count the
+    days inside the range. ``filters`` are lookups on the rollup rows.
+    """
+    rows = AppointmentRollup.objects.filter(day__range=(date_from, date_to), **filters)
+    if interval == WEEK:
+        rows = rows.annotate(bucket=TruncWeek('day'))
+    elif interval == MONTH:
+        rows = rows.annotate(bucket=TruncMonth('day'))
+    else:
+        rows = rows.annotate(bucket=F('day'))
+    group = GROUPS[group_by]
+
+    series = {start: {'bucket': start, 'total': 0, 'counts': {}} for start in bucket_starts(date_from, date_to, interval)}
+    for row in rows.values('bucket', group).annotate(total=Sum('count')).order_by():
+        if not row['total']:
+            continue
+        entry = series[row['bucket']]
+        entry['total'] += row['total']
+        entry['counts'][row[group]] = entry['counts'].get(row[group], 0) + row['total']
+    return list(series.values())
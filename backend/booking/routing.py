@@ -0,0 +1,155 @@
+"""Read-replica routing with read-your-writes stickiness.
+
+With ``DATABASE_REPLICA_URL`` set, ``ReplicaPinningMiddleware`` lets safe
+requests (GET, HEAD, OPTIONS) read from the ``replica`` alias. Everything else
+uses the primary: writes, reads inside a transaction, unsafe requests from
+start to finish, and code outside a request such as management commands.
+
+A request sticks to the primary once it writes. Its caller, identified by
+the user id in its access token, then keeps reading from the primary for
+``DATABASE_REPLICA_STICKY_SECONDS``, so a patient sees the booking they
+just made even while the replica lags, also from another tab or after a
+token refresh. The window is kept in Django's cache, which must be shared
+(``CACHE_REDIS_URL``) when several processes serve the API.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_CACHE_KEY = 'db:sticky:{}'
+
+
+class _Routing:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_current = ContextVar('db_routing', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        if routing is None or not routing.use_replica or routing.wrote:
+            return DEFAULT_DB_ALIAS
+        # Reads in a transaction on the primary must see its uncommitted rows.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+
+def _routed(content, routing):
+    iterator = iter(content)
+    while True:
+        token = _current.set(routing)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+async def _arouted(content, routing):
+    iterator = aiter(content)
+    while True:
+        token = _current.set(routing)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+def _keep_routing(response, routing):
+    # A streaming body runs its queries after the middleware has returned.
+    if response.streaming and routing.use_replica:
+        wrap = _arouted if response.is_async else _routed
+        response.streaming_content = wrap(response.streaming_content, routing)
+
+
+def _caller_key(request):
+    # Middleware runs before DRF authenticates, so read the user id claim from
+    # the token here; only the signature is checked, with no database access.
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        user_id = authentication.get_validated_token(raw_token).get(jwt_settings.USER_ID_CLAIM)
+    except AuthenticationFailed:
+        return None
+    if user_id is None:
+        return None
+    return STICKY_CACHE_KEY.format(user_id)
+
+
+class ReplicaPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if REPLICA not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        key = _caller_key(request)
+        routing = _Routing(request.method in SAFE_METHODS and not (key and cache.get(key)))
+        token = _current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        _keep_routing(response, routing)
+        if self.should_stick(request, key, routing):
+            cache.set(key, True, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = _caller_key(request)
+        routing = _Routing(request.method in SAFE_METHODS and not (key and await cache.aget(key)))
+        token = _current.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        _keep_routing(response, routing)
+        if self.should_stick(request, key, routing):
+            await cache.aset(key, True, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
+
+    @staticmethod
+    def should_stick(request, key, routing):
+        return key is not None and (routing.wrote or request.method not in SAFE_METHODS)
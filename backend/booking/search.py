@@ -0,0 +1,87 @@
+"""Typo-tolerant doctor search over name and specialization.
+
+PostgreSQL uses pg_trgm word similarity, served by the GIN trigram indexes
+created in migration 0009. Other databases (SQLite in development and tests)
+fall back to the same measure computed in process, which is fine for small
+directories but scans every doctor.
+
+The fallback follows word_similarity's definition: the best similarity
+between the query's trigrams and any continuous run of the text's
+trigrams, which may span several words. pg_trgm searches for that run
+greedily and can settle for a slightly lower score on texts that repeat
+trigrams, so rankings can differ between the two in such edge cases.
+"""
+from django.db import connection
+from django.db.models import Q
+
+SEARCH_FIELDS = ('name', 'specialization')
+
+# Matches pg_trgm's default word_similarity_threshold.
+MIN_SCORE = 0.6
+
+
+def _matching(queryset, term, fields):
+    """Filter ``queryset`` to doctors whose ``fields`` resemble ``term``, on PostgreSQL."""
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__trigram_word_similar': term})
+    return queryset.filter(condition)
+
+
+def ranked(queryset, term, limit, fields=SEARCH_FIELDS):
+    """Return up to ``limit`` ``(doctor, score)`` pairs, best match first."""
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        similarities = [TrigramWordSimilarity(term, field) for field in fields]
+        score = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        doctors = _matching(queryset, term, fields).annotate(score=score).order_by('-score', 'pk')[:limit]
+        return [(doctor, doctor.score) for doctor in doctors]
+
+    scores = _score_in_process(queryset, term, fields)
+    best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    doctors = queryset.in_bulk([pk for pk, _ in best])
+    return [(doctors[pk], score) for pk, score in best]
+
+
+def _score_in_process(queryset, term, fields):
+    query = _trigrams(term)
+    if not query:
+        return {}
+    scores = {}
+    for row in queryset.order_by().values_list('pk', *fields):
+        score = max(_word_similarity(query, value or '') for value in row[1:])
+        if score >= MIN_SCORE:
+            scores[row[0]] = score
+    return scores
+
+
+def _trigram_sequence(text):
+    # pg_trgm pads each alphanumeric word with two spaces in front and one behind.
+    grams = []
+    for word in ''.join(ch if ch.isalnum() else ' ' for ch in text.lower()).split():
+        padded = f'  {word} '
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _trigrams(text):
+    return set(_trigram_sequence(text))
+
+
+def _word_similarity(query, text):
+    # Jaccard similarity of ``query`` with each run of the text's trigrams;
+    # the best runs start and end on a trigram the query shares.
+    sequence = _trigram_sequence(text)
+    best = 0.0
+    for start, first in enumerate(sequence):
+        if first not in query:
+            continue
+        extent = set()
+        for gram in sequence[start:]:
+            extent.add(gram)
+            if gram in query:
+                shared = len(extent & query)
+                best = max(best, shared / (len(query) + len(extent) - shared))
+    return best
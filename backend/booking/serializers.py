@@ -1,9 +1,16 @@
+from datetime import date, datetime, timedelta
+
 from django.contrib.auth import authenticate
+from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import User, Patient, Doctor, Slot, Appointment
+from . import counters, passwords, rollups, transitions
+from .timing import TimedSerializerMixin
+from .models import ACTIVE_APPOINTMENT_STATUSES, User, Patient, Doctor, Slot, Appointment, ArchivedAppointment
 
 
 class PatientRegisterSerializer(serializers.ModelSerializer):
@@ -41,30 +48,62 @@ class PatientRegisterSerializer(serializers.ModelSerializer):
         email = validated_data.get('email')
         username = email # Use email as username for simplicity
 
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=validated_data['password'],
-            role=User.Roles.PATIENT,
-        )
-        Patient.objects.create(
-            user=user,
-            full_name=full_name,
-            age=age,
-            gender=gender,
-            phone=phone,
-            medical_history=medical_history,
-        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=validated_data['password'],
+                role=User.Roles.PATIENT,
+            )
+            Patient.objects.create(
+                user=user,
+                full_name=full_name,
+                age=age,
+                gender=gender,
+                phone=phone,
+                medical_history=medical_history,
+            )
+            counters.patients_changed(1)
         return user
 
 
 class LoginSerializer(serializers.Serializer):
+    """Authenticate a user of ``role`` and load their profile in the same query.
+
+    Subclasses set ``role`` and, for roles with a profile, ``profile`` (the
+    reverse one-to-one accessor) and ``profile_claim`` (the key its id is
+    returned and embedded in the tokens under).
+    """
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
-    def _generate_tokens(self, user):
+    role = None
+    profile = None
+    profile_claim = None
+
+    def validate(self, attrs):
+        users = User.objects.filter(email=attrs.get('email'), role=self.role)
+        if self.profile:
+            users = users.select_related(self.profile)
+        user = users.first()
+        if not passwords.verify(user, attrs.get('password')):
+            raise serializers.ValidationError('Invalid credentials')
+
+        claims = {}
+        if self.profile:
+            try:
+                claims[self.profile_claim] = getattr(user, self.profile).id
+            except ObjectDoesNotExist:
+                raise serializers.ValidationError('Invalid credentials')
+        tokens = self._generate_tokens(user, **claims)
+        return {**tokens, 'user_id': user.id, **claims}
+
+    def _generate_tokens(self, user, **claims):
         refresh = RefreshToken.for_user(user)
         refresh['role'] = user.role
+        # Profile ids let StatelessJWTAuthentication scope requests from claims alone.
+        for claim, value in claims.items():
+            refresh[claim] = value
         return {
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -73,48 +112,22 @@ class LoginSerializer(serializers.Serializer):
 
 
 class PatientLoginSerializer(LoginSerializer):
-    def validate(self, attrs):
-        email = attrs.get('email')
-        password = attrs.get('password')
-        try:
-            user = User.objects.get(email=email, role=User.Roles.PATIENT)
-        except User.DoesNotExist:
-            raise serializers.ValidationError('Invalid credentials')
-        if not user.check_password(password):
-            raise serializers.ValidationError('Invalid credentials')
-        tokens = self._generate_tokens(user)
-        return {**tokens, 'user_id': user.id, 'patient_id': user.patient_profile.id}
+    role = User.Roles.PATIENT
+    profile = 'patient_profile'
+    profile_claim = 'patient_id'
 
 
 class DoctorLoginSerializer(LoginSerializer):
-    def validate(self, attrs):
-        email = attrs.get('email')
-        password = attrs.get('password')
-        try:
-            user = User.objects.get(email=email, role=User.Roles.DOCTOR)
-        except User.DoesNotExist:
-            raise serializers.ValidationError('Invalid credentials')
-        if not user.check_password(password):
-            raise serializers.ValidationError('Invalid credentials')
-        tokens = self._generate_tokens(user)
-        return {**tokens, 'user_id': user.id, 'doctor_id': user.doctor_profile.id}
+    role = User.Roles.DOCTOR
+    profile = 'doctor_profile'
+    profile_claim = 'doctor_id'
 
 
 class AdminLoginSerializer(LoginSerializer):
-    def validate(self, attrs):
-        email = attrs.get('email')
-        password = attrs.get('password')
-        try:
-            user = User.objects.get(email=email, role=User.Roles.ADMIN)
-        except User.DoesNotExist:
-            raise serializers.ValidationError('Invalid credentials')
-        if not user.check_password(password):
-            raise serializers.ValidationError('Invalid credentials')
-        tokens = self._generate_tokens(user)
-        return {**tokens, 'user_id': user.id}
+    role = User.Roles.ADMIN
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
 
     class Meta:
@@ -122,7 +135,12 @@ class DoctorSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'specialization', 'phone', 'email']
 
 
-class PatientProfileSerializer(serializers.ModelSerializer):
+class DoctorSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class PatientProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email')
 
     class Meta:
@@ -146,7 +164,7 @@ class PatientProfileSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class SlotSerializer(serializers.ModelSerializer):
+class SlotSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     doctor = DoctorSerializer(read_only=True)
     is_booked = serializers.SerializerMethodField()
 
@@ -156,21 +174,247 @@ class SlotSerializer(serializers.ModelSerializer):
         read_only_fields = ['doctor']
 
     def get_is_booked(self, obj):
-        return Appointment.objects.filter(slot=obj).exclude(status='REJECTED').exists()
+        # List querysets come from Slot.objects.with_booking_state(); only
+        # freshly created or otherwise unannotated slots need a lookup.
+        if hasattr(obj, 'is_booked'):
+            return obj.is_booked
+        return Appointment.objects.filter(slot=obj, status__in=ACTIVE_APPOINTMENT_STATUSES).exists()
+
+
+class SlotScheduleSerializer(serializers.Serializer):
+    """A recurring schedule, e.g. Mon-Fri 09:00-13:00 in 15-minute slots."""
+
+    MAX_SLOTS = 20000
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        default=[0, 1, 2, 3, 4],
+        allow_empty=False,
+        help_text='ISO weekday numbers counted from Monday = 0.',
+    )
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    slot_minutes = serializers.IntegerField(min_value=5, max_value=480)
+    skip_dates = serializers.ListField(child=serializers.DateField(), default=list)
+
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'end_date must not be before start_date.'})
+        if attrs['end_time'] <= attrs['start_time']:
+            raise serializers.ValidationError({'end_time': 'end_time must be after start_time.'})
+        day_minutes = self._minutes(attrs['end_time']) - self._minutes(attrs['start_time'])
+        per_day = day_minutes // attrs['slot_minutes']
+        if per_day == 0:
+            raise serializers.ValidationError({'slot_minutes': 'No slot fits between start_time and end_time.'})
+        days = (attrs['end_date'] - attrs['start_date']).days + 1
+        if per_day * days > self.MAX_SLOTS:
+            raise serializers.ValidationError(f'A schedule may generate at most {self.MAX_SLOTS} slots per request.')
+        return attrs
+
+    @staticmethod
+    def _minutes(value):
+        return value.hour * 60 + value.minute
+
+    def build_slots(self, doctor_id):
+        """Expand the validated schedule into unsaved Slot instances."""
+        data = self.validated_data
+        weekdays = set(data['weekdays'])
+        skip_dates = set(data['skip_dates'])
+        step = timedelta(minutes=data['slot_minutes'])
+        anchor = datetime.min
+        day_start = datetime.combine(anchor, data['start_time'])
+        day_end = datetime.combine(anchor, data['end_time'])
+        times = []
+        current = day_start
+        while current + step <= day_end:
+            times.append((current.time(), (current + step).time()))
+            current += step
+
+        slots = []
+        day = data['start_date']
+        while day <= data['end_date']:
+            if day.weekday() in weekdays and day not in skip_dates:
+                slots.extend(
+                    Slot(doctor_id=doctor_id, date=day, start_time=start, end_time=end)
+                    for start, end in times
+                )
+            day += timedelta(days=1)
+        return slots
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    MAX_WINDOW_DAYS = 62
+    DEFAULT_WINDOW_DAYS = 14
+
+    def get_fields(self):
+        # ``from`` is a Python keyword, so the fields cannot be declared as attributes.
+        return {
+            'from': serializers.DateField(required=False),
+            'to': serializers.DateField(required=False),
+        }
+
+    def validate(self, attrs):
+        date_from = attrs.get('from') or timezone.localdate()
+        # Ordinals rather than timedelta arithmetic, which overflows at date.max.
+        date_to = attrs.get('to') or date.fromordinal(
+            min(date_from.toordinal() + self.DEFAULT_WINDOW_DAYS - 1, date.max.toordinal())
+        )
+        if date_to < date_from:
+            raise serializers.ValidationError({'to': '"to" must not be before "from".'})
+        if (date_to - date_from).days >= self.MAX_WINDOW_DAYS:
+            raise serializers.ValidationError({'to': f'The window may span at most {self.MAX_WINDOW_DAYS} days.'})
+        return {'from': date_from, 'to': date_to}
+
+
+class AnalyticsTrendsQuerySerializer(serializers.Serializer):
+    MAX_BUCKETS = 400
+    DEFAULT_WINDOW_DAYS = 30
+
+    def get_fields(self):
+        # ``from`` is a Python keyword, so the fields cannot be declared as attributes.
+        return {
+            'from': serializers.DateField(required=False),
+            'to': serializers.DateField(required=False),
+            'interval': serializers.ChoiceField(choices=rollups.INTERVALS, default=rollups.DAY),
+            'group_by': serializers.ChoiceField(choices=sorted(rollups.GROUPS), default='status'),
+            'doctor_id': serializers.IntegerField(min_value=1, required=False),
+            'specialization': serializers.CharField(max_length=255, required=False),
+            'status': serializers.ChoiceField(choices=Appointment.Status.choices, required=False),
+        }
+
+    def validate(self, attrs):
+        date_to = attrs.get('to') or timezone.localdate()
+        # Ordinals rather than timedelta arithmetic, which overflows at date.min.
+        date_from = attrs.get('from') or date.fromordinal(max(date_to.toordinal() - self.DEFAULT_WINDOW_DAYS + 1, 1))
+        if date_to < date_from:
+            raise serializers.ValidationError({'to': '"to" must not be before "from".'})
+        buckets = rollups.bucket_count(date_from, date_to, attrs['interval'])
+        if buckets > self.MAX_BUCKETS:
+            raise serializers.ValidationError(
+                {'from': f'The range spans {buckets} {attrs["interval"]}s; at most {self.MAX_BUCKETS} are allowed.'}
+            )
+        return {**attrs, 'from': date_from, 'to': date_to}
+
+
+class DoctorImportRowSerializer(serializers.Serializer):
+    # The email is the username too, which is the shorter column.
+    email = serializers.EmailField(max_length=150)
+    name = serializers.CharField(max_length=255)
+    specialization = serializers.CharField(max_length=255)
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True)
+
+    def validate_email(self, value):
+        return User.objects.normalize_email(value)
+
+
+class PatientImportRowSerializer(serializers.Serializer):
+    email = serializers.EmailField(max_length=150)
+    full_name = serializers.CharField(max_length=255)
+    age = serializers.IntegerField(min_value=0, max_value=150)
+    gender = serializers.CharField(max_length=20)
+    phone = serializers.CharField(max_length=20)
+    medical_history = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_email(self, value):
+        return User.objects.normalize_email(value)
+
+
+class AppointmentExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+    doctor_id = serializers.IntegerField(min_value=1, required=False)
+    status = serializers.ChoiceField(choices=Appointment.Status.choices, required=False)
+    date = serializers.DateField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_to'] < attrs['date_from']:
+            raise serializers.ValidationError({'date_to': '"date_to" must not be before "date_from".'})
+        return attrs
+
+
+class CompactQuerySerializer(serializers.Serializer):
+    # Each doctor once per page under ``doctors``; rows refer to it by id (booking.fastpath).
+    compact = serializers.BooleanField(default=False)
+
+
+class AppointmentListQuerySerializer(CompactQuerySerializer):
+    include_archived = serializers.BooleanField(default=False)
+    # Recent changes only, e.g. for notifications (served by appt_updated_idx).
+    updated_after = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if attrs['compact'] and attrs['include_archived']:
+            raise serializers.ValidationError({'compact': 'Not available together with include_archived.'})
+        return attrs
+
+
+class AppointmentTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), min_length=1, max_length=200)
+    status = serializers.ChoiceField(choices=sorted(transitions.ALLOWED_FROM))
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     patient = serializers.StringRelatedField(read_only=True)
     doctor = DoctorSerializer(read_only=True)
     slot = SlotSerializer(read_only=True)
-    slot_id = serializers.PrimaryKeyRelatedField(source='slot', queryset=Slot.objects.all(), write_only=True)
+    # The doctor comes with the slot, so a new booking renders without fetching it.
+    slot_id = serializers.PrimaryKeyRelatedField(
+        source='slot', queryset=Slot.objects.select_related('doctor__user'), write_only=True,
+    )
 
     class Meta:
         model = Appointment
         fields = ['id', 'patient', 'doctor', 'slot', 'slot_id', 'status', 'created_at', 'updated_at']
         read_only_fields = ['status', 'created_at', 'updated_at']
+        # The partial unique constraint on slot is enforced by the INSERT in
+        # AppointmentViewSet.perform_create; a pre-check here would only add
+        # a query and reopen the race it is meant to close.
+        validators = []
 
-    def validate_slot_id(self, value):
-        if Appointment.objects.filter(slot=value).exclude(status='REJECTED').exists():
-            raise serializers.ValidationError("This slot is already booked.")
-        return value
+    def to_representation(self, instance):
+        # An active appointment holds its slot; otherwise the slot is booked
+        # only if someone else has taken it since (annotated by the viewset).
+        if instance.status in ACTIVE_APPOINTMENT_STATUSES:
+            instance.slot.is_booked = True
+        elif hasattr(instance, 'slot_taken_by_other'):
+            instance.slot.is_booked = instance.slot_taken_by_other
+        return super().to_representation(instance)
+
+    def validate_slot_id(self, value):
+        # Only a booking claims a slot. Moving an appointment would skip the
+        # INSERT that arbitrates the slot and the counters kept on creation.
+        if self.instance is not None and value != self.instance.slot:
+            raise serializers.ValidationError('An appointment cannot move to another slot; cancel it and book again.')
+        return value
+
+
+class ArchivedAppointmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """An archived appointment in the same shape as ``AppointmentSerializer``, plus ``archived``."""
+
+    patient = serializers.StringRelatedField(read_only=True)
+    doctor = DoctorSerializer(read_only=True)
+    slot = serializers.SerializerMethodField()
+    archived = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedAppointment
+        fields = ['id', 'patient', 'doctor', 'slot', 'status', 'created_at', 'updated_at', 'archived']
+        read_only_fields = fields
+
+    def get_slot(self, obj):
+        slot = Slot(
+            id=obj.slot_id,
+            doctor=obj.doctor,
+            date=obj.slot_date,
+            start_time=obj.slot_start_time,
+            end_time=obj.slot_end_time,
+        )
+        # Annotated by the viewset, as for hot appointments.
+        slot.is_booked = getattr(obj, 'slot_taken_by_other', False)
+        return SlotSerializer(slot).data
+
+    def get_archived(self, obj):
+        return True
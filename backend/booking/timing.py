@@ -0,0 +1,180 @@
+"""Per-request timings, reported as a ``Server-Timing`` header and a log line.
+
+With ``REQUEST_TIMING`` enabled, every response carries::
+
+    Server-Timing: db;dur=12.4;desc="14 queries", auth;dur=0.3,
+                   serialize;dur=3.1;desc="9 queries", view;dur=2.2, total;dur=18.0
+
+The parts do not overlap and add up to ``total``: ``db`` is all SQL time,
+``auth`` and ``serialize`` exclude the SQL they issued, and ``view`` is
+everything else (view logic, routing, middleware, rendering). Queries issued
+while serializing are counted separately because a lazy relation touched per
+row shows up there as an N+1 pattern.
+
+Each request is also logged on ``booking.timing``: one INFO line normally,
+and a WARNING listing the most expensive statements once it takes longer
+than ``REQUEST_TIMING_SLOW_MS``. Statements are logged without parameters.
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+AUTH = 'auth'
+SERIALIZE = 'serialize'
+
+_current = ContextVar('request_timing', default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = None
+        self.spans = {}
+        # (seconds, sql, innermost open span or None)
+        self.queries = []
+        self.open = []
+
+    def db_time(self, span=None):
+        return sum(seconds for seconds, _, where in self.queries if span is None or where == span)
+
+    def query_count(self, span=None):
+        return sum(1 for _, _, where in self.queries if span is None or where == span)
+
+    def parts(self):
+        """Return ``{name: seconds}`` for the non-overlapping parts of the request."""
+        parts = {'db': self.db_time()}
+        for name in (AUTH, SERIALIZE):
+            if name in self.spans:
+                parts[name] = max(self.spans[name] - self.db_time(name), 0)
+        parts['view'] = max(self.total - sum(parts.values()), 0)
+        parts['total'] = self.total
+        return parts
+
+    def worst_queries(self, limit):
+        """Return ``(count, seconds, sql)`` for the costliest statements, repeats grouped."""
+        grouped = {}
+        for seconds, sql, _ in self.queries:
+            count, total = grouped.get(sql, (0, 0))
+            grouped[sql] = (count + 1, total + seconds)
+        worst = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(count, seconds, sql) for sql, (count, seconds) in worst]
+
+
+@contextmanager
+def span(name):
+    """Attribute the enclosed time to ``name``. A no-op when timing is off or ``name`` is already open."""
+    metrics = _current.get()
+    if metrics is None or name in metrics.open:
+        yield
+        return
+    metrics.open.append(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.open.remove(name)
+        metrics.spans[name] = metrics.spans.get(name, 0) + time.perf_counter() - started
+
+
+class TimedSerializerMixin:
+    """Count a serializer's ``to_representation`` as ``serialize`` time."""
+
+    def to_representation(self, instance):
+        with span(SERIALIZE):
+            return super().to_representation(instance)
+
+
+def _query_recorder(metrics):
+    def record(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            where = metrics.open[-1] if metrics.open else None
+            metrics.queries.append((time.perf_counter() - started, sql, where))
+
+    return record
+
+
+@contextmanager
+def _recording(metrics):
+    token = _current.set(metrics)
+    recorder = _query_recorder(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            yield
+    finally:
+        metrics.total = time.perf_counter() - metrics.started
+        _current.reset(token)
+
+
+def header_value(parts, metrics):
+    entries = []
+    for name, seconds in parts.items():
+        entry = f'{name};dur={seconds * 1000:.1f}'
+        if name == 'db':
+            entry += f';desc="{metrics.query_count()} queries"'
+        elif name == SERIALIZE:
+            entry += f';desc="{metrics.query_count(SERIALIZE)} queries"'
+        entries.append(entry)
+    return ', '.join(entries)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = Metrics()
+        with _recording(metrics):
+            response = self.get_response(request)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = Metrics()
+        with _recording(metrics):
+            response = await self.get_response(request)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        parts = metrics.parts()
+        response['Server-Timing'] = header_value(parts, metrics)
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.query_count(),
+            'serialize_queries': metrics.query_count(SERIALIZE),
+            **{f'{name}_ms': round(seconds * 1000, 1) for name, seconds in parts.items()},
+        }
+        message = ' '.join(f'{key}={value}' for key, value in fields.items())
+        if parts['total'] * 1000 < settings.REQUEST_TIMING_SLOW_MS:
+            logger.info(message, extra={'timing': fields})
+            return response
+
+        lines = [f'slow request {message}']
+        for count, seconds, sql in metrics.worst_queries(settings.REQUEST_TIMING_SLOW_QUERIES):
+            lines.append(f'  {seconds * 1000:.1f}ms x{count}: {sql}')
+        logger.warning('\n'.join(lines), extra={'timing': fields})
+        return response
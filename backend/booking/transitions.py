@@ -0,0 +1,90 @@
+"""Appointment status state machine.
+
+``apply`` moves many appointments at once with a single conditional UPDATE:
+the caller's ownership and the legal source statuses are both part of the
+WHERE clause, so an appointment that is not theirs, or that has moved on
+since they looked at it, is left untouched.
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+
+from . import counters, events, rollups
+from .authentication import owner_filter
+from .models import ACTIVE_APPOINTMENT_STATUSES, Appointment
+
+Status = Appointment.Status
+
+# Target status -> statuses it may be reached from. REJECTED, CANCELLED and
+# COMPLETED are terminal.
+ALLOWED_FROM = {
+    Status.APPROVED: {Status.PENDING},
+    Status.REJECTED: {Status.PENDING, Status.APPROVED},
+    Status.CANCELLED: {Status.PENDING, Status.APPROVED},
+    Status.COMPLETED: {Status.APPROVED},
+}
+
+ROLE_TARGETS = {
+    'DOCTOR': {Status.APPROVED, Status.REJECTED, Status.COMPLETED},
+    'PATIENT': {Status.CANCELLED},
+    'ADMIN': set(ALLOWED_FROM),
+}
+
+UPDATED = 'updated'
+NOT_FOUND = 'not_found'
+INVALID = 'invalid_transition'
+
+
+def scope_for(user):
+    """Appointments ``user`` may change; doubles as the ownership condition."""
+    if user.role == 'DOCTOR':
+        return Appointment.objects.filter(**owner_filter(user, 'doctor'))
+    if user.role == 'PATIENT':
+        return Appointment.objects.filter(**owner_filter(user, 'patient'))
+    return Appointment.objects.all()
+
+
+def apply(user, ids, target):
+    """Move the appointments in ``ids`` to ``target`` and report per id.
+
+    Returns ``[{'id', 'result', 'status'}]`` in the order of ``ids``, where
+    ``status`` is the appointment's status afterwards. Appointments the user
+    cannot see are reported as ``not_found`` without a status.
+    """
+    if target not in ROLE_TARGETS.get(user.role, ()):
+        raise PermissionDenied('Not allowed.')
+    sources = ALLOWED_FROM[target]
+    ids = list(dict.fromkeys(ids))
+    owned = scope_for(user).filter(pk__in=ids)
+
+    with transaction.atomic():
+        current = {}
+        slots = {}
+        days = {}
+        for pk, doctor_id, slot_id, day, status in (
+            # Locked in id order, so overlapping batches cannot deadlock each other.
+            owned.select_for_update(of=('self',)).order_by('id')
+            .values_list('id', 'doctor_id', 'slot_id', 'slot__date', 'status')
+        ):
+            current[pk] = (doctor_id, status)
+            slots[pk] = slot_id
+            days[pk] = day
+        movable = [pk for pk, (_, status) in current.items() if status in sources]
+        if movable:
+            owned.filter(pk__in=movable, status__in=sources).update(status=target, updated_at=timezone.now())
+            counters.appointments_moved([current[pk] for pk in movable], target)
+            rollups.appointments_moved([(current[pk][0], days[pk], current[pk][1]) for pk in movable], target)
+            if target not in ACTIVE_APPOINTMENT_STATUSES:
+                for pk in movable:
+                    if current[pk][1] in ACTIVE_APPOINTMENT_STATUSES:
+                        events.slot_changed(current[pk][0], slots[pk], events.FREED)
+
+    results = []
+    for pk in ids:
+        if pk not in current:
+            results.append({'id': pk, 'result': NOT_FOUND})
+        elif current[pk][1] in sources:
+            results.append({'id': pk, 'result': UPDATED, 'status': target})
+        else:
+            results.append({'id': pk, 'result': INVALID, 'status': current[pk][1]})
+    return results
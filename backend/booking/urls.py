@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
     PatientRegisterView,
     PatientLoginView,
@@ -9,11 +10,15 @@ from .views import (
     PatientProfileView,
     DoctorDashboardStatsView,
     AdminDashboardAnalyticsView,
+    AdminAnalyticsTrendsView,
+    AdminDatabasePoolView,
     DoctorViewSet,
     SlotViewSet,
     AppointmentViewSet,
     AdminDoctorViewSet,
+    AdminImportView,
     AdminPatientListView,
+    doctor_slot_events,
 )
 
 router = DefaultRouter()
@@ -30,7 +35,22 @@ urlpatterns = [
     path('patient/profile', PatientProfileView.as_view(), name='patient-profile'),
     path('doctor/dashboard-stats', DoctorDashboardStatsView.as_view(), name='doctor-dashboard-stats'),
     path('admin/analytics', AdminDashboardAnalyticsView.as_view(), name='admin-analytics'),
+    path('admin/analytics/trends', AdminAnalyticsTrendsView.as_view(), name='admin-analytics-trends'),
     path('admin/patients', AdminPatientListView.as_view(), name='admin-patients'),
+    path('admin/database/pool', AdminDatabasePoolView.as_view(), name='admin-database-pool'),
+    path('admin/doctors/import', AdminImportView.as_view(kind='doctors'), name='admin-doctor-import'),
+    path('admin/patients/import', AdminImportView.as_view(kind='patients'), name='admin-patient-import'),
+    path('doctors/<int:pk>/slot-events/', doctor_slot_events, name='doctor-slot-events'),
 ]
 
 urlpatterns += router.urls
+
+# Async mirrors of the read-only endpoints, for ASGI deployments.
+urlpatterns += [
+    path('async/doctors/', async_views.doctor_list, name='async-doctor-list'),
+    path('async/doctors/<int:pk>/slots/', async_views.doctor_slots, name='async-doctor-slots'),
+    path('async/doctors/<int:pk>/slot-events/', async_views.doctor_slot_events, name='async-doctor-slot-events'),
+    path('async/appointments/', async_views.appointment_list, name='async-appointment-list'),
+    path('async/doctor/dashboard-stats', async_views.doctor_dashboard_stats, name='async-doctor-dashboard-stats'),
+    path('async/admin/analytics', async_views.admin_analytics, name='async-admin-analytics'),
+]
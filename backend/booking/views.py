@@ -1,12 +1,34 @@
-from django.db.models import Count
+import io
+from functools import partial
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, status, viewsets, serializers
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Doctor, Slot, Appointment, Patient, User
+from . import counters, events, exports, fastpath, imports, pooling, rollups, search, transitions
+from .authentication import doctor_id_for, owner_filter, patient_id_for, revoke
+from .conditional import ConditionalListMixin, row_version
+from .exceptions import SlotUnavailable
+from .models import ACTIVE_APPOINTMENT_STATUSES, Doctor, Slot, Appointment, ArchivedAppointment, Patient, User
+from .pagination import AppointmentCursorPagination, MergedAppointmentPagination, SlotCursorPagination
 from .permissions import IsPatient, IsDoctor, IsAdmin
 from .serializers import (
+    AppointmentTransitionSerializer,
+    AppointmentExportQuerySerializer,
+    AppointmentListQuerySerializer,
+    CompactQuerySerializer,
+    AnalyticsTrendsQuerySerializer,
+    AvailabilityQuerySerializer,
+    DoctorSearchQuerySerializer,
     PatientRegisterSerializer,
     PatientLoginSerializer,
     DoctorLoginSerializer,
@@ -14,7 +36,9 @@ from .serializers import (
     DoctorSerializer,
     SlotSerializer,
     AppointmentSerializer,
+    ArchivedAppointmentSerializer,
     PatientProfileSerializer,
+    SlotScheduleSerializer,
 )
 
 
@@ -23,8 +47,7 @@ class PatientRegisterView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
-class PatientLoginView(generics.GenericAPIView):
-    serializer_class = PatientLoginSerializer
+class LoginView(generics.GenericAPIView):
     permission_classes = [AllowAny]
 
     def post(self, request, *args, **kwargs):
@@ -33,96 +56,140 @@ class PatientLoginView(generics.GenericAPIView):
         return Response(serializer.validated_data)
 
 
-class DoctorLoginView(generics.GenericAPIView):
-    serializer_class = DoctorLoginSerializer
-    permission_classes = [AllowAny]
+class PatientLoginView(LoginView):
+    serializer_class = PatientLoginSerializer
 
-    def post(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.validated_data)
+
+class DoctorLoginView(LoginView):
+    serializer_class = DoctorLoginSerializer
 
 
-class AdminLoginView(generics.GenericAPIView):
+class AdminLoginView(LoginView):
     serializer_class = AdminLoginSerializer
-    permission_classes = [AllowAny]
 
-    def post(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.validated_data)
-
-
+
 class PatientProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = PatientProfileSerializer
     permission_classes = [IsPatient]
 
     def get_object(self):
-        return self.request.user.patient_profile
+        patient_id = getattr(self.request.user, 'patient_id', None)
+        lookup = {'pk': patient_id} if patient_id is not None else {'user_id': self.request.user.pk}
+        return get_object_or_404(Patient.objects.select_related('user'), **lookup)
 
 
 class DoctorDashboardStatsView(generics.GenericAPIView):
     permission_classes = [IsDoctor]
 
     def get(self, request, *args, **kwargs):
-        appointments = Appointment.objects.filter(doctor__user=request.user)
-        status_counts = {
-            item['status']: item['total']
-            for item in appointments.values('status').annotate(total=Count('id'))
-        }
-        total = appointments.count()
-        approved = status_counts.get(Appointment.Status.APPROVED, 0)
-        pending = status_counts.get(Appointment.Status.PENDING, 0)
+        return Response(self.payload(counters.snapshot(**owner_filter(request.user, 'doctor'))))
 
-        return Response({
-            'total_appointments': total,
-            'approved_appointments': approved,
-            'pending_appointments': pending,
+    @staticmethod
+    def payload(status_counts):
+        return {
+            'total_appointments': status_counts.get(counters.APPOINTMENTS, 0),
+            'approved_appointments': status_counts.get(Appointment.Status.APPROVED, 0),
+            'pending_appointments': status_counts.get(Appointment.Status.PENDING, 0),
             'rejected_appointments': status_counts.get(Appointment.Status.REJECTED, 0),
             'cancelled_appointments': status_counts.get(Appointment.Status.CANCELLED, 0),
-            'available_slots': Slot.objects.filter(doctor__user=request.user).count(),
+            'available_slots': status_counts.get(counters.SLOTS, 0),
             'status_summary': [
                 {'status': status_value, 'count': status_counts.get(status_value, 0)}
                 for status_value, _ in Appointment.Status.choices
             ],
-        })
+        }
 
 
 class AdminDashboardAnalyticsView(generics.GenericAPIView):
     permission_classes = [IsAdmin]
 
     def get(self, request, *args, **kwargs):
-        appointments = Appointment.objects.all()
-        status_counts = {
-            item['status']: item['total']
-            for item in appointments.values('status').annotate(total=Count('id'))
-        }
-        doctor_activity = (
-            Doctor.objects
-            .annotate(total_appointments=Count('appointments'))
-            .order_by('-total_appointments')[:6]
-        )
+        return Response(self.payload(counters.snapshot(doctor__isnull=True), counters.top_doctors(6)))
 
-        return Response({
-            'total_patients': Patient.objects.count(),
-            'total_doctors': Doctor.objects.count(),
-            'total_appointments': appointments.count(),
+    @staticmethod
+    def payload(status_counts, doctor_activity):
+        return {
+            'total_patients': status_counts.get(counters.PATIENTS, 0),
+            'total_doctors': status_counts.get(counters.DOCTORS, 0),
+            'total_appointments': status_counts.get(counters.APPOINTMENTS, 0),
             'appointment_status_summary': [
                 {'status': status_value, 'count': status_counts.get(status_value, 0)}
                 for status_value, _ in Appointment.Status.choices
             ],
             'doctor_statistics': [
                 {
-                    'doctor': doctor.name,
-                    'specialization': doctor.specialization,
-                    'appointments': doctor.total_appointments,
+                    'doctor': counter.doctor.name,
+                    'specialization': counter.doctor.specialization,
+                    'appointments': counter.value,
+                }
+                for counter in doctor_activity
+            ],
+        }
+
+
+class AdminAnalyticsTrendsView(generics.GenericAPIView):
+    """Appointments per day, week or month of slot date, grouped by status, doctor or specialization.
+
+    Reads the pre-aggregated rollups rather than the appointment rows.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        query = AnalyticsTrendsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        filters = {}
+        if 'doctor_id' in params:
+            filters['doctor_id'] = params['doctor_id']
+        if 'specialization' in params:
+            filters['doctor__specialization__iexact'] = params['specialization']
+        if 'status' in params:
+            filters['status'] = params['status']
+        series = rollups.trends(params['from'], params['to'], params['interval'], params['group_by'], **filters)
+
+        totals = {}
+        for entry in series:
+            for key, count in entry['counts'].items():
+                totals[key] = totals.get(key, 0) + count
+        return Response({
+            'from': params['from'].isoformat(),
+            'to': params['to'].isoformat(),
+            'interval': params['interval'],
+            'group_by': params['group_by'],
+            'groups': self.groups(params['group_by'], sorted(totals, key=lambda key: (-totals[key], str(key))), totals),
+            'series': [
+                {
+                    'bucket': entry['bucket'].isoformat(),
+                    'total': entry['total'],
+                    'counts': {str(key): count for key, count in entry['counts'].items()},
                 }
-                for doctor in doctor_activity
+                for entry in series
             ],
         })
 
+    @staticmethod
+    def groups(group_by, keys, totals):
+        """Describe each group in ``series`` counts, busiest first."""
+        if group_by == 'doctor':
+            names = dict(Doctor.objects.filter(pk__in=keys).values_list('id', 'name'))
+            return [{'key': str(key), 'label': names.get(key, ''), 'total': totals[key]} for key in keys]
+        if group_by == 'status':
+            labels = dict(Appointment.Status.choices)
+            return [{'key': key, 'label': labels.get(key, key), 'total': totals[key]} for key in keys]
+        return [{'key': key, 'label': key, 'total': totals[key]} for key in keys]
+
+
+class AdminDatabasePoolView(generics.GenericAPIView):
+    """Connection pool counters of the process that serves the request."""
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        return Response(pooling.stats())
+
 
-class DoctorViewSet(viewsets.ReadOnlyModelViewSet):
+class DoctorViewSet(ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Doctor.objects.select_related('user').all()
     serializer_class = DoctorSerializer
     permission_classes = [AllowAny]
@@ -134,34 +201,202 @@ class DoctorViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(specialization__icontains=specialization)
         return qs
 
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(
+            self.paginator,
+            page,
+            lambda: self.get_paginated_response(self.get_serializer(page, many=True).data),
+            partial(row_version, related=['user']),
+        )
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search_directory(self, request):
+        query = DoctorSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        results = search.ranked(
+            self.get_queryset(),
+            query.validated_data['q'],
+            limit=query.validated_data['limit'],
+        )
+        return Response({
+            'results': [
+                {**self.get_serializer(doctor).data, 'score': round(score, 3)}
+                for doctor, score in results
+            ],
+        })
+
     @action(detail=True, methods=['get'], url_path='slots')
     def slots(self, request, pk=None):
+        query = CompactQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
         doctor = self.get_object()
-        # Show only slots that are NOT booked (approved or pending)
-        slots = doctor.slots.exclude(
-            appointment__status__in=[Appointment.Status.APPROVED, Appointment.Status.PENDING]
+        # Show only slots that no active appointment holds
+        free = Slot.objects.filter(doctor=doctor).with_booking_state().filter(is_booked=False)
+
+        slots = free.select_related('doctor__user')
+        paginator = SlotCursorPagination()
+        if query.validated_data['compact']:
+            rows = paginator.paginate_queryset(fastpath.slot_values(slots), request, view=self)
+
+            def render():
+                results, doctors = fastpath.slot_page(rows)
+                response = paginator.get_paginated_response(results)
+                response.data['doctors'] = doctors
+                return response
+        else:
+            rows = paginator.paginate_queryset(slots, request, view=self)
+
+            def render():
+                return paginator.get_paginated_response(SlotSerializer(rows, many=True).data)
+
+        # A booking or a cancellation changes which slots are on the page.
+        return self.conditional_response(
+            paginator, rows, render, partial(row_version, related=['doctor', 'doctor__user']),
+        )
+
+    @action(detail=True, methods=['get'], url_path='availability')
+    def availability(self, request, pk=None):
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        date_from = query.validated_data['from']
+        date_to = query.validated_data['to']
+
+        doctor = self.get_object()
+        rows = (
+            Slot.objects.filter(doctor=doctor, date__range=(date_from, date_to))
+            .with_booking_state()
+            .order_by('date', 'start_time')
+            .values_list('id', 'date', 'start_time', 'end_time', 'is_booked')
         )
-        serializer = SlotSerializer(slots, many=True)
-        return Response(serializer.data)
+        days = {}
+        for slot_id, day, start_time, end_time, is_booked in rows:
+            bucket = days.get(day)
+            if bucket is None:
+                bucket = days[day] = {
+                    'date': day.isoformat(),
+                    'slot_ids': [],
+                    'start_times': [],
+                    'end_times': [],
+                    'free': [],
+                }
+            bucket['slot_ids'].append(slot_id)
+            bucket['start_times'].append(start_time.isoformat())
+            bucket['end_times'].append(end_time.isoformat())
+            bucket['free'].append(not is_booked)
+
+        return Response({
+            'doctor': self.get_serializer(doctor).data,
+            'from': date_from.isoformat(),
+            'to': date_to.isoformat(),
+            'days': list(days.values()),
+        })
+
+
+def doctor_slot_events(request, pk):
+    """Server-sent events for one doctor's slots: ``booked`` and ``freed``.
+
+    A plain Django view: EventSource sends ``Accept: text/event-stream``,
+    which DRF's content negotiation would refuse, and the stream is public
+    like the slot list it keeps current. Under WSGI it answers 204; see
+    ``booking.events``.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    get_object_or_404(Doctor, pk=pk)
+    response = events.response(request, pk)
+    if response.streaming:
+        # Don't hold a database connection for the life of the stream.
+        connection.close()
+    return response
 
 
 class SlotViewSet(viewsets.ModelViewSet):
     serializer_class = SlotSerializer
     permission_classes = [IsDoctor]
+    pagination_class = SlotCursorPagination
+    GENERATE_ATTEMPTS = 3
 
     def get_queryset(self):
-        return Slot.objects.filter(doctor__user=self.request.user)
+        return (
+            Slot.objects.filter(**owner_filter(self.request.user, 'doctor'))
+            .select_related('doctor__user')
+            .with_booking_state()
+        )
 
     def perform_create(self, serializer):
-        doctor = getattr(self.request.user, 'doctor_profile', None)
-        if not doctor:
+        doctor_id = doctor_id_for(self.request.user)
+        if not doctor_id:
              raise serializers.ValidationError({'detail': 'Doctor profile not found.'})
-        serializer.save(doctor=doctor)
+        with transaction.atomic():
+            serializer.save(doctor_id=doctor_id)
+            counters.slots_changed(doctor_id, 1)
+
+    def perform_update(self, serializer):
+        slot = serializer.instance
+        moved = any(
+            field in serializer.validated_data and serializer.validated_data[field] != getattr(slot, field)
+            for field in ('date', 'start_time', 'end_time')
+        )
+        with transaction.atomic():
+            if moved:
+                # Appointments and their rollup buckets follow the slot's date,
+                # so only a slot nobody has booked may move. The row lock makes
+                # a concurrent booking wait until the move has committed.
+                Slot.objects.select_for_update().filter(pk=slot.pk).exists()
+                if slot.appointments.exists():
+                    raise serializers.ValidationError(
+                        {'detail': 'This slot has appointments, so its date and times cannot change.'}
+                    )
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # Deleting the slot cascades to its appointments.
+            removed = list(instance.appointments.values_list('doctor_id', 'status'))
+            instance.delete()
+            counters.appointments_removed(removed)
+            rollups.appointments_removed([(doctor_id, instance.date, status) for doctor_id, status in removed])
+            counters.slots_changed(instance.doctor_id, -1)
+
+    @action(detail=False, methods=['post'], url_path='generate')
+    def generate(self, request):
+        doctor_id = doctor_id_for(request.user)
+        if not doctor_id:
+            raise serializers.ValidationError({'detail': 'Doctor profile not found.'})
+        schedule = SlotScheduleSerializer(data=request.data)
+        schedule.is_valid(raise_exception=True)
+        window = Slot.objects.filter(
+            doctor_id=doctor_id,
+            date__range=(schedule.validated_data['start_date'], schedule.validated_data['end_date']),
+        )
+        for _ in range(self.GENERATE_ATTEMPTS):
+            # Fresh instances each attempt: a rolled-back insert leaves pks behind.
+            slots = schedule.build_slots(doctor_id)
+            try:
+                with transaction.atomic():
+                    # Slots that already exist are skipped, so ``missing`` is exactly what gets inserted.
+                    existing = set(window.values_list('date', 'start_time', 'end_time'))
+                    missing = [slot for slot in slots if (slot.date, slot.start_time, slot.end_time) not in existing]
+                    Slot.objects.bulk_create(missing, batch_size=1000)
+                    counters.slots_changed(doctor_id, len(missing))
+            except IntegrityError:
+                # Another request added one of these slots after the lookup; look again.
+                continue
+            return Response(
+                {'created': len(missing), 'skipped': len(slots) - len(missing)},
+                status=status.HTTP_201_CREATED,
+            )
+        return Response(
+            {'detail': 'Slots in this range are being changed by another request; please retry.'},
+            status=status.HTTP_409_CONFLICT,
+        )
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AppointmentCursorPagination
 
     def get_permissions(self):
         if self.action == 'create':
@@ -170,75 +405,190 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         elif self.action in ['approve', 'reject', 'cancel']:
             permission_classes = [IsAuthenticated]
+        elif self.action == 'export':
+            permission_classes = [IsAdmin]
         else:
             permission_classes = [IsAuthenticated]
         return [perm() for perm in permission_classes]
 
     def get_queryset(self):
-        user = self.request.user
-        qs = Appointment.objects.select_related('patient', 'doctor', 'slot')
+        return self.visible(
+            Appointment.objects
+            .select_related('patient', 'doctor__user', 'slot__doctor__user')
+            .with_slot_booking_state(),
+            self.request.user,
+            self.request.query_params,
+        )
+
+    def list(self, request, *args, **kwargs):
+        query = AppointmentListQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        if query.validated_data['include_archived']:
+            paginator = MergedAppointmentPagination()
+            rows = paginator.paginate_querysets([self.get_queryset(), self.archived_queryset()], request)
+            render = partial(self.render_with_archive, paginator, rows)
+        elif query.validated_data['compact']:
+            paginator = self.paginator
+            rows = paginator.paginate_queryset(fastpath.appointment_values(self.get_queryset()), request, view=self)
+            render = partial(self.render_compact, rows)
+        else:
+            paginator = self.paginator
+            rows = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+            render = partial(self.render_page, rows)
+        return self.conditional_response(paginator, rows, render, self.row_version)
+
+    @staticmethod
+    def row_version(row):
+        # Also covers whether someone else has since booked a freed slot.
+        related = ['patient', 'doctor', 'doctor__user']
+        if isinstance(row, Appointment):
+            related.append('slot')
+        return row_version(row, related, annotations=['slot_taken_by_other'])
+
+    def render_page(self, rows):
+        return self.get_paginated_response(self.get_serializer(rows, many=True).data)
+
+    def render_compact(self, rows):
+        results, doctors = fastpath.appointment_page(rows)
+        response = self.get_paginated_response(results)
+        response.data['doctors'] = doctors
+        return response
+
+    def archived_queryset(self):
+        return self.visible_archived(self.request.user, self.request.query_params)
+
+    @classmethod
+    def visible_archived(cls, user, params):
+        """The archived counterpart of ``visible``, annotated like the hot rows."""
+        taken = Appointment.objects.filter(slot_id=OuterRef('slot_id'), status__in=ACTIVE_APPOINTMENT_STATUSES)
+        return (
+            cls.visible(ArchivedAppointment.objects.select_related('patient', 'doctor__user'), user, params, date_field='slot_date')
+            .annotate(slot_taken_by_other=Exists(taken))
+        )
+
+    def render_with_archive(self, paginator, rows):
+        return paginator.get_paginated_response(self.merged_data(rows))
+
+    @staticmethod
+    def merged_data(rows):
+        """One cursor over hot and archived appointments, newest first."""
+        return [
+            ArchivedAppointmentSerializer(row).data if isinstance(row, ArchivedAppointment)
+            else {**AppointmentSerializer(row).data, 'archived': False}
+            for row in rows
+        ]
+
+    @staticmethod
+    def visible(qs, user, params, date_field='slot__date'):
+        """Narrow ``qs`` to what ``user`` may list, applying the role's filters from ``params``.
+
+        Also serves archived appointments, whose slot date is ``slot_date``.
+        """
+        updated_after = params.get('updated_after')
+        if updated_after:
+            qs = qs.filter(updated_at__gte=updated_after)
         if user.role == 'PATIENT':
-            return qs.filter(patient__user=user)
+            return qs.filter(**owner_filter(user, 'patient'))
         if user.role == 'DOCTOR':
-            return qs.filter(doctor__user=user)
+            qs = qs.filter(**owner_filter(user, 'doctor'))
+            status_param = params.get('status')
+            if status_param:
+                qs = qs.filter(status=status_param)
+            return qs
         if user.role == 'ADMIN':
-            doctor_id = self.request.query_params.get('doctor_id')
-            status_param = self.request.query_params.get('status')
-            date_param = self.request.query_params.get('date')
+            doctor_id = params.get('doctor_id')
+            status_param = params.get('status')
+            date_param = params.get('date')
             if doctor_id:
                 qs = qs.filter(doctor_id=doctor_id)
             if status_param:
                 qs = qs.filter(status=status_param)
             if date_param:
-                qs = qs.filter(slot__date=date_param)
+                qs = qs.filter(**{date_field: date_param})
             return qs
-        return Appointment.objects.none()
+        return qs.none()
 
     def perform_create(self, serializer):
-        user = self.request.user
-        patient = user.patient_profile
+        patient_id = patient_id_for(self.request.user)
+        if not patient_id:
+            raise serializers.ValidationError({'detail': 'Patient profile not found.'})
         slot = serializer.validated_data['slot']
-        # Double check availability in case of race conditions
-        if Appointment.objects.filter(slot=slot).exclude(status=Appointment.Status.REJECTED).exists():
-            raise serializers.ValidationError({"slot_id": "This slot has just been taken."})
-        
-        serializer.save(patient=patient, doctor=slot.doctor)
+        # The partial unique constraint on Appointment.slot arbitrates
+        # concurrent bookings: the INSERT either claims the slot or fails,
+        # with no check-then-insert window in between.
+        try:
+            with transaction.atomic():
+                appointment = serializer.save(patient_id=patient_id, doctor_id=slot.doctor_id)
+                counters.appointment_created(appointment.doctor_id, appointment.status)
+                rollups.appointment_created(appointment.doctor_id, slot.date, appointment.status)
+                events.slot_changed(slot.doctor_id, slot.id, events.BOOKED)
+        except IntegrityError:
+            raise SlotUnavailable()
+        appointment.doctor = slot.doctor
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.appointments_removed([(instance.doctor_id, instance.status)])
+            rollups.appointments_removed([(instance.doctor_id, instance.slot.date, instance.status)])
+            if instance.status in ACTIVE_APPOINTMENT_STATUSES:
+                events.slot_changed(instance.doctor_id, instance.slot_id, events.FREED)
+
+    def _transition(self, pk, target):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        result = transitions.apply(self.request.user, [pk], target)[0]
+        if result['result'] == transitions.NOT_FOUND:
+            raise Http404
+        if result['result'] == transitions.INVALID:
+            return Response(
+                {'detail': f"A {result['status'].lower()} appointment cannot be moved to {target.lower()}."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.get_serializer(self.get_object()).data)
 
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
-        appointment = self.get_object()
-        user = request.user
-        if user.role not in ['DOCTOR', 'ADMIN']:
-            return Response({'detail': 'Not allowed.'}, status=status.HTTP_403_FORBIDDEN)
-        if user.role == 'DOCTOR' and appointment.doctor.user != user:
-            return Response({'detail': 'Not allowed.'}, status=status.HTTP_403_FORBIDDEN)
-        
-        appointment.status = Appointment.Status.APPROVED
-        appointment.save()
-        return Response(self.get_serializer(appointment).data)
+        return self._transition(pk, Appointment.Status.APPROVED)
 
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
-        appointment = self.get_object()
-        user = request.user
-        if user.role not in ['DOCTOR', 'ADMIN']:
-            return Response({'detail': 'Not allowed.'}, status=status.HTTP_403_FORBIDDEN)
-        if user.role == 'DOCTOR' and appointment.doctor.user != user:
-            return Response({'detail': 'Not allowed.'}, status=status.HTTP_403_FORBIDDEN)
-        
-        appointment.status = Appointment.Status.REJECTED
-        appointment.save()
-        return Response(self.get_serializer(appointment).data)
+        return self._transition(pk, Appointment.Status.REJECTED)
 
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
-        appointment = self.get_object()
-        if appointment.patient.user != request.user and request.user.role != 'ADMIN':
-            return Response({'detail': 'Not allowed.'}, status=status.HTTP_403_FORBIDDEN)
-        
-        appointment.status = Appointment.Status.CANCELLED
-        appointment.save()
-        return Response(self.get_serializer(appointment).data)
+        return self._transition(pk, Appointment.Status.CANCELLED)
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        serializer = AppointmentTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = serializer.validated_data['status']
+        results = transitions.apply(request.user, serializer.validated_data['ids'], target)
+        return Response({
+            'status': target,
+            'updated': sum(1 for r in results if r['result'] == transitions.UPDATED),
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching appointment as CSV or NDJSON (``?output=``).
+
+        Takes the admin list filters plus a slot date range. The format
+        parameter is not ``format``, which DRF reserves for its renderers.
+        """
+        query = AppointmentExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        qs = self.visible(Appointment.objects.all(), request.user, params)
+        if 'date_from' in params:
+            qs = qs.filter(slot__date__gte=params['date_from'])
+        if 'date_to' in params:
+            qs = qs.filter(slot__date__lte=params['date_to'])
+        return exports.stream(qs, params['output'], is_async=isinstance(request._request, ASGIRequest))
 
 
 class AdminDoctorViewSet(viewsets.ModelViewSet):
@@ -259,8 +609,10 @@ class AdminDoctorViewSet(viewsets.ModelViewSet):
         if User.objects.filter(email=email).exists():
             return Response({'detail': 'User with this email already exists.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = User.objects.create_user(username=email, email=email, password=password, role=User.Roles.DOCTOR)
-        doctor = Doctor.objects.create(user=user, name=name, specialization=specialization, phone=data.get('phone', ''))
+        with transaction.atomic():
+            user = User.objects.create_user(username=email, email=email, password=password, role=User.Roles.DOCTOR)
+            doctor = Doctor.objects.create(user=user, name=name, specialization=specialization, phone=data.get('phone', ''))
+            counters.doctor_added(doctor.id)
         return Response(self.get_serializer(doctor).data, status=status.HTTP_201_CREATED)
 
     def update(self, request, *args, **kwargs):
@@ -284,11 +636,44 @@ class AdminDoctorViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         user = instance.user
-        instance.delete()
-        user.delete()
+        with transaction.atomic():
+            counters.doctor_removed(instance.id)
+            instance.delete()
+            user.delete()
+        revoke(user.pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class AdminImportView(generics.GenericAPIView):
+    """Create doctors or patients in bulk from an uploaded CSV (``file``).
+
+    An optional ``password`` becomes every imported account's initial
+    password; without one the accounts cannot sign in until it is set.
+    Responds with the numbers created and failed and a per-row error report.
+    """
+    permission_classes = [IsAdmin]
+    parser_classes = [MultiPartParser]
+    kind = None
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['Upload the CSV as "file".']}, status=status.HTTP_400_BAD_REQUEST)
+        password = request.data.get('password') or None
+        if password:
+            try:
+                validate_password(password)
+            except DjangoValidationError as exc:
+                return Response({'password': exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = imports.IMPORTERS[self.kind](password)
+        try:
+            report = importer.run(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        except imports.ImportFormatError as exc:
+            return Response({'file': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+
 class AdminPatientListView(generics.ListAPIView):
     queryset = Patient.objects.select_related('user').all()
     permission_classes = [IsAdmin]
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'booking.timing.ServerTimingMiddleware',
+    'booking.routing.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -76,18 +79,47 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'hospital_backend.wsgi.application'
 
+# Pooled connections (Django's psycopg 3 pool): each process keeps between
+# DATABASE_POOL_MIN_SIZE and DATABASE_POOL_MAX_SIZE PostgreSQL connections
+# open and health-checks them on checkout, instead of reconnecting whenever
+# a connection has sat idle past CONN_MAX_AGE.
+DATABASE_POOL = env_bool('DATABASE_POOL', False)
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10')),
+    # Seconds a request waits for a free connection before failing.
+    'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', '10')),
+    # Connections above min_size close after this long unused.
+    'max_idle': float(os.environ.get('DATABASE_POOL_MAX_IDLE', '300')),
+    'max_lifetime': float(os.environ.get('DATABASE_POOL_MAX_LIFETIME', '3600')),
+}
+
+
+def database_settings(config):
+    config['CONN_HEALTH_CHECKS'] = True
+    if DATABASE_POOL and config['ENGINE'] == 'django.db.backends.postgresql':
+        # The pool owns connection lifetimes; Django must not keep its own.
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = dict(DATABASE_POOL_OPTIONS)
+    return config
+
+
+def database_from_url(url):
+    return database_settings(dj_database_url.parse(
+        url,
+        conn_max_age=30,
+        ssl_require=env_bool('DATABASE_SSL_REQUIRE', not DEBUG),
+        # Transaction-mode poolers cannot hold server-side cursors open.
+        disable_server_side_cursors=env_bool('DATABASE_DISABLE_SERVER_SIDE_CURSORS', False),
+    ))
+
+
 database_url = os.environ.get('DATABASE_URL')
 if database_url:
-    DATABASES = {
-        'default': dj_database_url.parse(
-            database_url,
-            conn_max_age=30,
-            ssl_require=env_bool('DATABASE_SSL_REQUIRE', not DEBUG),
-        )
-    }
+    DATABASES = {'default': database_from_url(database_url)}
 else:
     DATABASES = {
-        'default': {
+        'default': database_settings({
             'ENGINE': 'django.db.backends.postgresql',
             'NAME': os.environ.get('POSTGRES_DB', 'hospital_db'),
             'USER': os.environ.get('POSTGRES_USER', 'postgres'),
@@ -95,6 +127,35 @@ else:
             'HOST': os.environ.get('POSTGRES_HOST', '127.0.0.1'),
             'PORT': os.environ.get('POSTGRES_PORT', '5432'),
             'CONN_MAX_AGE': 30,
+        })
+    }
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Concurrent writers (threaded servers, the booking race tests) need
+    # transactions that take the write lock up front; a deferred one that
+    # has to upgrade fails with "database is locked" instead of waiting. The
+    # shared in-memory test database locks whole tables, so tests use a file.
+    DATABASES['default']['TEST'] = {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault('transaction_mode', 'IMMEDIATE')
+
+# Optional streaming read replica. Safe requests read from it unless their
+# caller wrote within DATABASE_REPLICA_STICKY_SECONDS (booking.routing).
+replica_url = os.environ.get('DATABASE_REPLICA_URL')
+if replica_url:
+    DATABASES['replica'] = database_from_url(replica_url)
+    # Tests read the test primary through this alias.
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['booking.routing.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', '10'))
+
+# Django's cache holds the JWT active flags and the replica stickiness
+# windows. Share it through Redis when more than one process serves the API.
+cache_redis_url = os.environ.get('CACHE_REDIS_URL')
+if cache_redis_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': cache_redis_url,
         }
     }
 
@@ -134,13 +195,69 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'booking.User'
 
+# Authenticate from token claims (role, profile ids) instead of loading the
+# user on every request; the active flag is re-checked after this many seconds.
+JWT_STATELESS_AUTH = env_bool('JWT_STATELESS_AUTH', False)
+JWT_REVOCATION_CACHE_SECONDS = int(os.environ.get('JWT_REVOCATION_CACHE_SECONDS', '60'))
+
+# At most LOGIN_HASH_WORKERS logins hash a password at once; more wait up to
+# LOGIN_HASH_WAIT_SECONDS for a turn, then get a 503 with Retry-After. The cap
+# stays below the gunicorn threads (start.sh) so at least one thread is always
+# left for other requests.
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', '4'))
+LOGIN_HASH_WORKERS = max(1, min(
+    int(os.environ.get('LOGIN_HASH_WORKERS', str(os.cpu_count() or 2))),
+    GUNICORN_THREADS - 1,
+))
+LOGIN_HASH_WAIT_SECONDS = float(os.environ.get('LOGIN_HASH_WAIT_SECONDS', '2'))
+
+# Slot availability event streams (booking.events). Use 'redis' when more
+# than one process serves the API so every worker sees every event.
+SLOT_EVENTS_BROKER = os.environ.get('SLOT_EVENTS_BROKER', 'inprocess')
+SLOT_EVENTS_REDIS_URL = os.environ.get('SLOT_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+SLOT_EVENTS_KEEPALIVE_SECONDS = int(os.environ.get('SLOT_EVENTS_KEEPALIVE_SECONDS', '15'))
+SLOT_EVENTS_MAX_SECONDS = int(os.environ.get('SLOT_EVENTS_MAX_SECONDS', '300'))
+
+# manage.py archive_history moves finished appointments and past slots older
+# than this many days into the archive tables.
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '30'))
+
+# Per-request Server-Timing header and timing log lines (booking.timing).
+# Requests slower than REQUEST_TIMING_SLOW_MS also log their costliest SQL.
+REQUEST_TIMING = env_bool('REQUEST_TIMING', False)
+REQUEST_TIMING_SLOW_MS = int(os.environ.get('REQUEST_TIMING_SLOW_MS', '500'))
+REQUEST_TIMING_SLOW_QUERIES = int(os.environ.get('REQUEST_TIMING_SLOW_QUERIES', '5'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'booking': {
+            'handlers': ['console'],
+            'level': os.environ.get('BOOKING_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'booking.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS_AUTH
+        else 'booking.authentication.TimedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson-backed when orjson is installed; same output as DRF's JSONRenderer.
+    'DEFAULT_RENDERER_CLASSES': (
+        'booking.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'booking.pagination.IdCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 SIMPLE_JWT = {
@@ -3,4 +3,12 @@ set -e
 
 python manage.py collectstatic --noinput
 python manage.py migrate
-exec gunicorn hospital_backend.wsgi:application --bind 0.0.0.0:${PORT:-8000} --log-file -
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    # Event-loop workers; the async read views under /api/async/ wait on the
+    # database without holding a worker, and slot-events streams are served.
+    exec gunicorn hospital_backend.asgi:application --bind 0.0.0.0:${PORT:-8000} --worker-class uvicorn_worker.UvicornWorker --log-file -
+fi
+
+# Threaded workers; booking.passwords caps concurrent login hashes below
+# GUNICORN_THREADS so other requests keep a thread during a login burst.
+exec gunicorn hospital_backend.wsgi:application --bind 0.0.0.0:${PORT:-8000} --threads ${GUNICORN_THREADS:-4} --log-file -
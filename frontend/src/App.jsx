@@ -17,7 +17,7 @@ import {
   CheckCircle2,
   UserCircle
 } from 'lucide-react'
-import api from './api/axios'
+import { getAllResults } from './utils/pagination'
 import LandingPage from './pages/LandingPage'
 import PatientLogin from './pages/auth/PatientLogin'
 import PatientRegister from './pages/auth/PatientRegister'
@@ -47,6 +47,9 @@ function cn(...inputs) {
   return twMerge(clsx(inputs))
 }
 
+// Upper bound on the pages of recent updates read per poll.
+const NOTIFICATION_PAGES = 4
+
 const Layout = ({ children }) => {
   const { role, logout } = useAuth()
   const [isSidebarOpen, setIsSidebarOpen] = useState(true)
@@ -59,15 +62,9 @@ const Layout = ({ children }) => {
 
     const loadNotifications = async () => {
       try {
-        const res = await api.get('appointments/')
-        const apps = Array.isArray(res.data) ? res.data : []
-        
-        // Generate notifications based on recent updates
-        const recentUpdates = apps.filter(a => {
-          const updatedAt = new Date(a.updated_at)
-          const now = new Date()
-          return (now - updatedAt) < 24 * 60 * 60 * 1000 // Last 24 hours
-        })
+        // Generate notifications based on updates in the last 24 hours
+        const since = new Date(Date.now() - 24 * 60 * 60 * 1000).toISOString()
+        const recentUpdates = await getAllResults('appointments/', { updated_after: since }, NOTIFICATION_PAGES)
 
         const mapped = recentUpdates
           .filter(a => !clearedIds.has(`${a.id}-${a.status}`)) // Filter out acknowledged states
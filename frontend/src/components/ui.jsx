@@ -102,3 +102,14 @@ export const EmptyState = ({
     {action && <div className="mt-6">{action}</div>}
   </motion.div>
 )
+
+export const LoadMore = ({ next, loading, onClick }) => {
+  if (!next) return null
+  return (
+    <div className="flex justify-center pt-2">
+      <button type="button" onClick={onClick} disabled={loading} className="btn btn-secondary">
+        {loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  )
+}
@@ -1,11 +1,12 @@
 import React, { useEffect, useState } from 'react'
 import { Calendar, Clock, User, Stethoscope, Filter, Search, Info } from 'lucide-react'
 import api from '../../api/axios'
+import { useCursorList } from '../../utils/pagination'
 import { getApiErrorMessage } from '../../utils/apiError'
-import { EmptyState, SkeletonBlock } from '../../components/ui'
+import { EmptyState, LoadMore, SkeletonBlock } from '../../components/ui'
 
 const AppointmentsOverview = () => {
-  const [appointments, setAppointments] = useState([])
+  const { items: appointments, next, loadingMore, setPage, loadMore } = useCursorList()
   const [filters, setFilters] = useState({ doctor_id: '', status: '', date: '' })
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -19,10 +20,10 @@ const AppointmentsOverview = () => {
       if (filters.status) params.status = filters.status
       if (filters.date) params.date = filters.date
       const res = await api.get('appointments/', { params })
-      setAppointments(res.data || [])
+      setPage(res.data)
     } catch (err) {
       setError(getApiErrorMessage(err, 'Failed to load appointments'))
-      setAppointments([])
+      setPage(null)
     } finally {
       setLoading(false)
     }
@@ -160,6 +161,7 @@ const AppointmentsOverview = () => {
               </div>
             </div>
           ))}
+          <LoadMore next={next} loading={loadingMore} onClick={loadMore} />
         </div>
       )}
     </div>
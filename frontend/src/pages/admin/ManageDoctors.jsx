@@ -2,11 +2,12 @@ import React, { useEffect, useState } from 'react'
 import { UserPlus, Stethoscope, Mail, Phone, Trash2, ShieldCheck } from 'lucide-react'
 import toast from 'react-hot-toast'
 import api from '../../api/axios'
+import { useCursorList } from '../../utils/pagination'
 import { getApiErrorMessage } from '../../utils/apiError'
-import { EmptyState, SkeletonBlock } from '../../components/ui'
+import { EmptyState, LoadMore, SkeletonBlock } from '../../components/ui'
 
 const ManageDoctors = () => {
-  const [doctors, setDoctors] = useState([])
+  const { items: doctors, setItems: setDoctors, next, loadingMore, setPage, loadMore } = useCursorList()
   const [form, setForm] = useState({ name: '', email: '', password: '', specialization: '', phone: '' })
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -16,10 +17,10 @@ const ManageDoctors = () => {
     setError('')
     try {
       const res = await api.get('admin/doctors/')
-      setDoctors(res.data || [])
+      setPage(res.data)
     } catch (err) {
       setError(getApiErrorMessage(err, 'Failed to load doctors'))
-      setDoctors([])
+      setPage(null)
     } finally {
       setLoading(false)
     }
@@ -53,7 +54,8 @@ const ManageDoctors = () => {
     try {
       await api.delete(`admin/doctors/${id}/`)
       toast.success('Doctor profile removed.', { id: toastId })
-      await loadDoctors()
+      // Keep the pages already loaded.
+      setDoctors((current) => current.filter((doctor) => doctor.id !== id))
     } catch (err) {
       toast.error(getApiErrorMessage(err, 'Failed to delete doctor.'), { id: toastId })
     }
@@ -155,7 +157,7 @@ const ManageDoctors = () => {
           <div className="flex items-center justify-between">
             <h3 className="text-xl font-bold text-secondary-900">Doctor Directory</h3>
             <div className="flex items-center space-x-2">
-              <span className="text-xs font-bold text-secondary-500 bg-secondary-100 px-3 py-1 rounded-full">{doctors.length} Records</span>
+              <span className="text-xs font-bold text-secondary-500 bg-secondary-100 px-3 py-1 rounded-full">{doctors.length}{next ? '+' : ''} Records</span>
             </div>
           </div>
 
@@ -203,6 +205,7 @@ const ManageDoctors = () => {
               ))}
             </div>
           )}
+          <LoadMore next={next} loading={loadingMore} onClick={loadMore} />
         </div>
       </div>
     </div>
@@ -2,11 +2,12 @@ import React, { useEffect, useState } from 'react'
 import { Calendar, Clock, User, Info } from 'lucide-react'
 import toast from 'react-hot-toast'
 import api from '../../api/axios'
+import { useCursorList } from '../../utils/pagination'
 import { getApiErrorMessage } from '../../utils/apiError'
-import { EmptyState, SkeletonBlock } from '../../components/ui'
+import { EmptyState, LoadMore, SkeletonBlock } from '../../components/ui'
 
 const DoctorAppointments = () => {
-  const [appointments, setAppointments] = useState([])
+  const { items: appointments, setItems: setAppointments, next, loadingMore, setPage, loadMore } = useCursorList()
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
 
@@ -15,10 +16,10 @@ const DoctorAppointments = () => {
     setError('')
     try {
       const res = await api.get('appointments/')
-      setAppointments(res.data || [])
+      setPage(res.data)
     } catch (err) {
       setError(getApiErrorMessage(err, 'Failed to load appointments'))
-      setAppointments([])
+      setPage(null)
     } finally {
       setLoading(false)
     }
@@ -31,9 +32,10 @@ const DoctorAppointments = () => {
   const updateStatus = async (id, action) => {
     const toastId = toast.loading(`${action === 'approve' ? 'Approving' : 'Rejecting'} appointment...`)
     try {
-      await api.post(`appointments/${id}/${action}/`)
+      const res = await api.post(`appointments/${id}/${action}/`)
       toast.success(`Appointment ${action === 'approve' ? 'approved' : 'rejected'}.`, { id: toastId })
-      await loadAppointments()
+      // Update in place, keeping the pages already loaded.
+      setAppointments((current) => current.map((a) => (a.id === id ? res.data : a)))
     } catch (err) {
       toast.error(getApiErrorMessage(err, `Failed to ${action} appointment.`), { id: toastId })
     }
@@ -127,6 +129,7 @@ const DoctorAppointments = () => {
               </div>
             </div>
           ))}
+          <LoadMore next={next} loading={loadingMore} onClick={loadMore} />
         </div>
       )}
     </div>
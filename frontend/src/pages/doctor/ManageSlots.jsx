@@ -2,11 +2,12 @@ import React, { useEffect, useState } from 'react'
 import { Calendar, Clock, Plus, Trash2, Info } from 'lucide-react'
 import toast from 'react-hot-toast'
 import api from '../../api/axios'
+import { useCursorList } from '../../utils/pagination'
 import { getApiErrorMessage } from '../../utils/apiError'
-import { EmptyState, SkeletonBlock } from '../../components/ui'
+import { EmptyState, LoadMore, SkeletonBlock } from '../../components/ui'
 
 const ManageSlots = () => {
-  const [slots, setSlots] = useState([])
+  const { items: slots, setItems: setSlots, next, loadingMore, setPage, loadMore } = useCursorList()
   const [form, setForm] = useState({ date: '', start_time: '', end_time: '' })
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -16,10 +17,10 @@ const ManageSlots = () => {
     setError('')
     try {
       const res = await api.get('slots/')
-      setSlots(res.data || [])
+      setPage(res.data)
     } catch (err) {
       setError(getApiErrorMessage(err, 'Failed to load slots'))
-      setSlots([])
+      setPage(null)
     } finally {
       setLoading(false)
     }
@@ -53,7 +54,8 @@ const ManageSlots = () => {
     try {
       await api.delete(`slots/${id}/`)
       toast.success('Slot removed', { id: toastId })
-      await loadSlots()
+      // Keep the pages already loaded.
+      setSlots((current) => current.filter((slot) => slot.id !== id))
     } catch (err) {
       toast.error(getApiErrorMessage(err, 'Failed to delete slot.'), { id: toastId })
     }
@@ -137,7 +139,7 @@ const ManageSlots = () => {
           <div className="flex items-center justify-between">
             <h3 className="text-xl font-bold text-secondary-900">Your Active Slots</h3>
             <span className="text-xs font-bold text-secondary-500 bg-secondary-100 px-3 py-1 rounded-full">
-              {slots.length} Total
+              {slots.length}{next ? '+' : ''} Total
             </span>
           </div>
 
@@ -179,6 +181,7 @@ const ManageSlots = () => {
               ))}
             </div>
           )}
+          <LoadMore next={next} loading={loadingMore} onClick={loadMore} />
         </div>
       </div>
     </div>
@@ -2,11 +2,12 @@ import React, { useEffect, useState } from 'react'
 import { Calendar, Clock, Stethoscope, CheckCircle2, XCircle, AlertCircle, Trash2 } from 'lucide-react'
 import toast from 'react-hot-toast'
 import api from '../../api/axios'
+import { useCursorList } from '../../utils/pagination'
 import { getApiErrorMessage } from '../../utils/apiError'
-import { EmptyState, SkeletonBlock } from '../../components/ui'
+import { EmptyState, LoadMore, SkeletonBlock } from '../../components/ui'
 
 const AppointmentHistory = () => {
-  const [appointments, setAppointments] = useState([])
+  const { items: appointments, setItems: setAppointments, next, loadingMore, setPage, loadMore } = useCursorList()
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
 
@@ -15,10 +16,10 @@ const AppointmentHistory = () => {
     setError('')
     try {
       const res = await api.get('appointments/')
-      setAppointments(res.data || [])
+      setPage(res.data)
     } catch (err) {
       setError(getApiErrorMessage(err, 'Failed to load appointments'))
-      setAppointments([])
+      setPage(null)
     } finally {
       setLoading(false)
     }
@@ -31,9 +32,10 @@ const AppointmentHistory = () => {
   const handleCancel = async (id) => {
     const toastId = toast.loading('Cancelling appointment...')
     try {
-      await api.post(`appointments/${id}/cancel/`)
+      const res = await api.post(`appointments/${id}/cancel/`)
       toast.success('Appointment cancelled.', { id: toastId })
-      fetchAppointments()
+      // Update in place, keeping the pages already loaded.
+      setAppointments((current) => current.map((a) => (a.id === id ? res.data : a)))
     } catch (err) {
       toast.error(getApiErrorMessage(err, 'Failed to cancel appointment.'), { id: toastId })
     }
@@ -134,6 +136,7 @@ const AppointmentHistory = () => {
               </div>
             </div>
           ))}
+          <LoadMore next={next} loading={loadingMore} onClick={loadMore} />
         </div>
       )}
     </div>
@@ -1,11 +1,39 @@
 import React, { useEffect, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
-import { Calendar, Clock, Stethoscope, Mail, Phone, ArrowLeft, CheckCircle2, AlertCircle } from 'lucide-react'
+import { Calendar, Clock, Stethoscope, Mail, Phone, ArrowLeft, CheckCircle2, AlertCircle, ChevronLeft, ChevronRight } from 'lucide-react'
 import toast from 'react-hot-toast'
 import api from '../../api/axios'
 import { getApiErrorMessage } from '../../utils/apiError'
 import { EmptyState, SkeletonBlock } from '../../components/ui'
 
+// Slots are listed one window of days at a time.
+const WINDOW_DAYS = 14
+
+const shiftDate = (isoDate, days) => {
+  const date = new Date(`${isoDate}T00:00:00Z`)
+  date.setUTCDate(date.getUTCDate() + days)
+  return date.toISOString().split('T')[0]
+}
+
+const fetchAvailability = (doctorId, windowStart) =>
+  api.get(`doctors/${doctorId}/availability/`, {
+    params: { from: windowStart, to: shiftDate(windowStart, WINDOW_DAYS - 1) },
+  })
+
+// Flattens the compact per-day availability payload into bookable slots.
+const freeSlotsFrom = (availability) =>
+  (availability?.days || []).flatMap((day) =>
+    day.slot_ids
+      .map((slotId, i) => ({
+        id: slotId,
+        date: day.date,
+        start_time: day.start_times[i],
+        end_time: day.end_times[i],
+        free: day.free[i],
+      }))
+      .filter((slot) => slot.free)
+  )
+
 const DoctorDetail = () => {
   const { id } = useParams()
   const navigate = useNavigate()
@@ -14,26 +42,49 @@ const DoctorDetail = () => {
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [bookingId, setBookingId] = useState(null)
+  const today = new Date().toISOString().split('T')[0]
+  const [windowStart, setWindowStart] = useState(today)
+  const [windowLoading, setWindowLoading] = useState(false)
+  const windowEnd = shiftDate(windowStart, WINDOW_DAYS - 1)
 
   useEffect(() => {
     const fetchData = async () => {
-      setLoading(true)
+      setWindowLoading(true)
       setError('')
       try {
-        const [docRes, slotRes] = await Promise.all([
-          api.get(`doctors/${id}/`),
-          api.get(`doctors/${id}/slots/`),
-        ])
-        setDoctor(docRes.data)
-        setSlots(slotRes.data || [])
-      } catch (err) {
-        setError(getApiErrorMessage(err, 'Failed to load details'))
+        const res = await fetchAvailability(id, windowStart)
+        setDoctor(res.data.doctor)
+        setSlots(freeSlotsFrom(res.data))
+      } catch (err) {
+        setError(getApiErrorMessage(err, 'Failed to load details'))
       } finally {
         setLoading(false)
+        setWindowLoading(false)
       }
     }
     if (id) fetchData()
-  }, [id])
+  }, [id, windowStart])
+
+  // Live availability: drop slots as others book them, reload when one frees up.
+  // Servers not running under ASGI answer 204, which closes the stream for good.
+  // EventSource cannot send the JWT header; the endpoint is public by design.
+  useEffect(() => {
+    if (!id || typeof EventSource === 'undefined') return undefined
+    const source = new EventSource(`${api.defaults.baseURL}doctors/${id}/slot-events/`)
+    source.addEventListener('booked', (event) => {
+      const { slot_id: slotId } = JSON.parse(event.data)
+      setSlots((current) => current.filter((slot) => slot.id !== slotId))
+    })
+    source.addEventListener('freed', async () => {
+      try {
+        const res = await fetchAvailability(id, windowStart)
+        setSlots(freeSlotsFrom(res.data))
+      } catch (err) {
+        console.error('Slot refresh failed')
+      }
+    })
+    return () => source.close()
+  }, [id, windowStart])
 
   const bookAppointment = async (slotId) => {
     setBookingId(slotId)
@@ -43,9 +94,9 @@ const DoctorDetail = () => {
       toast.success('Appointment booked successfully!', { id: toastId })
       
       // Refresh slots
-      const slotRes = await api.get(`doctors/${id}/slots/`)
-      setSlots(slotRes.data || [])
-    } catch (err) {
+      const res = await fetchAvailability(id, windowStart)
+      setSlots(freeSlotsFrom(res.data))
+    } catch (err) {
       const errorMsg = getApiErrorMessage(err, 'Failed to book appointment')
       toast.error(errorMsg, { id: toastId })
     } finally {
@@ -115,8 +166,28 @@ const DoctorDetail = () => {
           </span>
         </div>
 
+        <div className="flex items-center justify-between">
+          <button
+            disabled={windowLoading || windowStart <= today}
+            onClick={() => setWindowStart(shiftDate(windowStart, -WINDOW_DAYS))}
+            className="btn btn-secondary text-sm flex items-center"
+          >
+            <ChevronLeft size={16} className="mr-1" /> Previous
+          </button>
+          <span className="text-sm font-medium text-secondary-600">
+            {windowStart} to {windowEnd}
+          </span>
+          <button
+            disabled={windowLoading}
+            onClick={() => setWindowStart(shiftDate(windowStart, WINDOW_DAYS))}
+            className="btn btn-secondary text-sm flex items-center"
+          >
+            Next <ChevronRight size={16} className="ml-1" />
+          </button>
+        </div>
+
         {slots.length === 0 ? (
-          <EmptyState icon={Clock} title="No available slots" message="No available slots for this doctor right now." />
+          <EmptyState icon={Clock} title="No available slots" message={`No available slots between ${windowStart} and ${windowEnd}.`} />
         ) : (
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
             {slots.map((s) => (
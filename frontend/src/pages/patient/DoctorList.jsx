@@ -2,11 +2,12 @@ import React, { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { Search, Stethoscope, ChevronRight, Info } from 'lucide-react'
 import api from '../../api/axios'
+import { useCursorList } from '../../utils/pagination'
 import { getApiErrorMessage } from '../../utils/apiError'
-import { EmptyState, SkeletonBlock } from '../../components/ui'
+import { EmptyState, LoadMore, SkeletonBlock } from '../../components/ui'
 
 const DoctorList = () => {
-  const [doctors, setDoctors] = useState([])
+  const { items: doctors, next, loadingMore, setPage, loadMore } = useCursorList()
   const [specialization, setSpecialization] = useState('')
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -15,13 +16,15 @@ const DoctorList = () => {
     setLoading(true)
     setError('')
     try {
-      const params = {}
-      if (spec) params.specialization = spec
-      const res = await api.get('doctors/', { params })
-      setDoctors(res.data || [])
+      // Ranked, typo-tolerant search over name and specialization.
+      const term = spec.trim()
+      const res = term.length > 1
+        ? await api.get('doctors/search/', { params: { q: term } })
+        : await api.get('doctors/')
+      setPage(res.data)
     } catch (err) {
       setError(getApiErrorMessage(err, 'Failed to load doctors'))
-      setDoctors([])
+      setPage(null)
     } finally {
       setLoading(false)
     }
@@ -50,7 +53,7 @@ const DoctorList = () => {
             <input
               type="text"
               className="input pl-10 h-12 py-3"
-              placeholder="Search by specialization (e.g. Cardiology)"
+              placeholder="Search by name or specialization (e.g. Cardiology)"
               value={specialization}
               onChange={(e) => setSpecialization(e.target.value)}
             />
@@ -78,7 +81,7 @@ const DoctorList = () => {
         <EmptyState
           icon={Stethoscope}
           title="No Specialists Found"
-          message="We couldn't find any doctors matching your search. Try a different specialization or browse all."
+          message="We couldn't find any doctors matching your search. Try a different name or specialization, or browse all."
           action={(
             <button onClick={() => {setSpecialization(''); fetchDoctors('')}} className="text-primary-600 font-bold hover:text-primary-700 transition-colors">
               Clear all filters
@@ -121,6 +124,7 @@ const DoctorList = () => {
           ))}
         </div>
       )}
+      <LoadMore next={next} loading={loadingMore} onClick={loadMore} />
     </div>
   )
 }
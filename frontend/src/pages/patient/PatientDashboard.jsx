@@ -2,7 +2,7 @@ import React, { useEffect, useMemo, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { ArrowRight, Calendar, CheckCircle, Clock, History, Stethoscope } from 'lucide-react'
 import { Cell, Pie, PieChart, ResponsiveContainer, Tooltip } from 'recharts'
-import api from '../../api/axios'
+import { getAllResults } from '../../utils/pagination'
 import { EmptyState, MotionCard, SkeletonBlock, StatCard } from '../../components/ui'
 import { getApiErrorMessage } from '../../utils/apiError'
 
@@ -14,6 +14,10 @@ const STATUS_COLORS = {
   COMPLETED: '#0ea5e9',
 }
 
+// The stats read at most this many pages of the newest appointments.
+const STATS_PAGES = 5
+const STATS_PAGE_SIZE = 200
+
 const PatientDashboard = () => {
   const [appointments, setAppointments] = useState([])
   const [loading, setLoading] = useState(true)
@@ -24,8 +28,8 @@ const PatientDashboard = () => {
       setLoading(true)
       setError('')
       try {
-        const res = await api.get('appointments/')
-        setAppointments(Array.isArray(res.data) ? res.data : [])
+        // Compact pages carry the statuses the stats need without the nested doctor.
+        setAppointments(await getAllResults('appointments/', { compact: true, page_size: STATS_PAGE_SIZE }, STATS_PAGES))
       } catch (err) {
         setError(getApiErrorMessage(err, 'Failed to fetch dashboard stats.'))
       } finally {
@@ -0,0 +1,50 @@
+import { useCallback, useState } from 'react'
+import toast from 'react-hot-toast'
+import api from '../api/axios'
+import { getApiErrorMessage } from './apiError'
+
+// List endpoints return cursor pages ({ next, previous, results }).
+export const getResults = (data) => {
+  if (Array.isArray(data)) return data
+  return Array.isArray(data?.results) ? data.results : []
+}
+
+// A list built from cursor pages: setPage() starts over from a first page,
+// loadMore() appends the page its `next` link points to.
+export const useCursorList = () => {
+  const [items, setItems] = useState([])
+  const [next, setNext] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+
+  const setPage = useCallback((data) => {
+    setItems(getResults(data))
+    setNext(data?.next || null)
+  }, [])
+
+  const loadMore = useCallback(async () => {
+    if (!next) return
+    setLoadingMore(true)
+    try {
+      const res = await api.get(next)
+      setItems((current) => [...current, ...getResults(res.data)])
+      setNext(res.data?.next || null)
+    } catch (err) {
+      toast.error(getApiErrorMessage(err, 'Failed to load more results.'))
+    } finally {
+      setLoadingMore(false)
+    }
+  }, [next])
+
+  return { items, setItems, next, loadingMore, setPage, loadMore }
+}
+
+// Every result of a list, following `next` for at most `maxPages` pages.
+export const getAllResults = async (path, params, maxPages = Infinity) => {
+  let res = await api.get(path, { params })
+  const results = getResults(res.data)
+  for (let pages = 1; res.data?.next && pages < maxPages; pages += 1) {
+    res = await api.get(res.data.next)
+    results.push(...getResults(res.data))
+  }
+  return results
+}